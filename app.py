@@ -1,10 +1,17 @@
-import math
 import random
+import time
 import numpy as np
 import tkinter as tk
-from tkinter import messagebox
+from tkinter import filedialog, messagebox
 from functools import partial
 
+from hull import graham_scan, chan, quickhull, hull_indices
+from incremental import IncrementalHull
+from points import PointStore
+from stats import HullStats
+from render import PointRaster, CanvasLayer, oval, line, hull_items
+from background import DemoRun
+
 
 COLORS = [ 
     'dark slate gray', 'dim gray', 'slate gray', 'navy', 'medium slate blue', 'dodger blue', 
@@ -20,32 +27,9 @@ COLORS = [
     'maroon', 'violet red', 'medium orchid', 'purple', 'medium purple',
 ]
 
-
-def partition(pts, r):
-    np.random.shuffle(pts)
-    H = [[] for _ in range(r)]
-    i = 0; j = 0
-    while j < len(pts):
-        H[i].append(pts[j])
-        if i == r - 1:
-            i = 0
-        else:
-            i += 1
-        j += 1
-    return H
-
-
-def angle(a, b, c):
-    if np.all(b==c) or np.all(a==c): 
-        return -np.inf # Do not consider degenerate angles
-    v1 = b - a; v2 = c - b
-    ang = np.arctan2(np.cross(v1, v2), np.dot(v1, v2))
-    ang = ang + 2*np.pi if ang < 0 else ang
-    return ang
-
-
-def orient(p1, p2, p3):
-    return (p2[1] - p1[1]) * (p3[0] - p1[0]) - (p2[0] - p1[0]) * (p3[1] - p1[1])
+# from this many points on, points are drawn into one image instead of one
+# canvas oval each
+RASTER_MIN_POINTS = 2000
 
 
 class DisplayBoard:
@@ -54,17 +38,24 @@ class DisplayBoard:
         self.win = win
         self.win.title("Convex Hull Demo")
         self.bg = self.win.cget('bg')
-        self.points = []
+        self.points = PointStore()
+        self.live = IncrementalHull()
 
         self.frm_display = tk.Frame(self.win)
         self.frm_controls = tk.Frame(self.win)
         self.frm_btns = tk.Frame(self.frm_controls)
         self.frm_alg =tk.Frame(self.frm_controls)
+        self.lbl_stats = tk.Label(self.frm_controls, text="", font=("Menlo", 10), justify=tk.LEFT)
+        self.lbl_progress = tk.Label(self.frm_controls, text="", font=("Menlo", 10))
 
         # Display Panel
         self.canvas = tk.Canvas(self.frm_display, width=600, height=600, bg="white")
         self.canvas.pack(side=tk.TOP)
         self.canvas.bind("<Button-1>", self.click_event)
+        self.cloud = PointRaster(600, 600)
+        self.photo = tk.PhotoImage(width=600, height=600)
+        self.cloud_groups = None
+        self.layer = CanvasLayer(self.canvas, "steps")
 
         # Control Panel
         self.btn_rand = tk.Button(self.frm_btns, text="Random", command=self.rand_event)
@@ -76,6 +67,9 @@ class DisplayBoard:
         self.btn_chan = tk.Button(self.frm_btns, text="Chan's Alg", command=partial(self.ch_event,"chan"))
         self.btn_chan.grid(row=0, column=2, sticky="n")
 
+        self.btn_qh = tk.Button(self.frm_btns, text="QuickHull", command=partial(self.ch_event,"qh"))
+        self.btn_qh.grid(row=0, column=3, sticky="n")
+
         self.btn_prev = tk.Button(self.frm_btns, text="Previous", command=partial(self.gs_step_event, "prev"))
         self.btn_next = tk.Button(self.frm_btns, text="Next", command=partial(self.gs_step_event, "next"))
         self.btn_finish = tk.Button(self.frm_btns, text="Finish", command=self.exit_gs_steps)
@@ -84,17 +78,36 @@ class DisplayBoard:
         self.btn_next2 = tk.Button(self.frm_btns, text="Next", command=partial(self.chan_step_event, "next"))
         self.btn_finish2 = tk.Button(self.frm_btns, text="Finish", command=self.exit_chan_steps)
 
+        self.btn_prev3 = tk.Button(self.frm_btns, text="Previous", command=partial(self.qh_step_event, "prev"))
+        self.btn_next3 = tk.Button(self.frm_btns, text="Next", command=partial(self.qh_step_event, "next"))
+        self.btn_finish3 = tk.Button(self.frm_btns, text="Finish", command=self.exit_qh_steps)
+
         self.btn_reset = tk.Button(self.frm_btns, text="Reset", command=self.reset_event)
         self.btn_reset.grid(row=1, column=0, sticky="n")
 
+        self.show_live = tk.BooleanVar(value=False)
+        self.chk_live = tk.Checkbutton(self.frm_btns, text="Live Hull", variable=self.show_live, command=self.draw_live)
+        self.chk_live.grid(row=1, column=1, sticky="n")
+
         self.btn_close = tk.Button(self.frm_btns, text="Close", command=self.close_event)
         self.btn_close.grid(row=1, column=2, sticky="n")
 
+        self.btn_cancel = tk.Button(self.frm_btns, text="Cancel", command=self.cancel_event)
+
+        self.btn_save = tk.Button(self.frm_btns, text="Save", command=self.save_event)
+        self.btn_save.grid(row=2, column=0, sticky="n")
+
+        self.btn_load = tk.Button(self.frm_btns, text="Load", command=self.load_event)
+        self.btn_load.grid(row=2, column=2, sticky="n")
+
         # Algorithm
         self.is_step_mode = False
         self.current_alg = ''
         self.steps = None
         self.current_step = 0
+        self.run = None       # DemoRun while the steps are being computed
+        self.run_stats = None
+        self.available = 0    # steps computed so far
         self.lbl_gs = [
             tk.Label(self.frm_alg, text="FUNCTION graham_scan(S):", font=("Menlo", 11)), #0
             tk.Label(self.frm_alg, text="    p1 <- lowest point of S", font=("Menlo", 11)), #1
@@ -127,51 +140,144 @@ class DisplayBoard:
             tk.Label(self.frm_alg, text="                RETURN {p1, ... p(i-1)}", font=("Menlo", 11)), #15
             tk.Label(self.frm_alg, text="        t <- t+1", font=("Menlo", 11)), #16
         ]
+        self.lbl_qh = [
+            tk.Label(self.frm_alg, text="FUNCTION quickhull(S):", font=("Menlo", 11)), #0
+            tk.Label(self.frm_alg, text="    a <- leftmost point of S; b <- rightmost point of S", font=("Menlo", 11)), #1
+            tk.Label(self.frm_alg, text="    W <- new Stack(); H <- new List()", font=("Menlo", 11)), #2
+            tk.Label(self.frm_alg, text="    W.push((b, a, points of S outside b->a))", font=("Menlo", 11)), #3
+            tk.Label(self.frm_alg, text="    W.push((a, b, points of S outside a->b))", font=("Menlo", 11)), #4
+            tk.Label(self.frm_alg, text="    WHILE W is not empty:", font=("Menlo", 11)), #5
+            tk.Label(self.frm_alg, text="        (p, q, X) <- W.pop()", font=("Menlo", 11)), #6
+            tk.Label(self.frm_alg, text="        IF X is empty:", font=("Menlo", 11)), #7
+            tk.Label(self.frm_alg, text="            H.append(p)", font=("Menlo", 11)), #8
+            tk.Label(self.frm_alg, text="        ELSE:", font=("Menlo", 11)), #9
+            tk.Label(self.frm_alg, text="            c <- point of X farthest from line pq", font=("Menlo", 11)), #10
+            tk.Label(self.frm_alg, text="            W.push((c, q, points of X outside c->q))", font=("Menlo", 11)), #11
+            tk.Label(self.frm_alg, text="            W.push((p, c, points of X outside p->c))", font=("Menlo", 11)), #12
+            tk.Label(self.frm_alg, text="    RETURN H", font=("Menlo", 11)), #13
+        ]
 
         # Pack frames
         self.frm_display.grid(row=0, column=0)
         self.frm_controls.grid(row=0, column=1, sticky='nsew')
         self.frm_btns.grid(row=0, column=0, sticky='n', padx=10, pady=20)
         self.frm_alg.grid(row=1, column=0, sticky='n')
+        self.lbl_stats.grid(row=2, column=0, sticky='w', padx=10, pady=10)
+        self.lbl_progress.grid(row=3, column=0, sticky='w', padx=10)
 
 
     def draw_ch(self, ccw_vertices, tag="ch", color="red"):
-        n = len(ccw_vertices)
-        for i, pt in enumerate(ccw_vertices):
-            x1, y1 = pt
-            x2, y2 = ccw_vertices[i+1] if i < n - 1 else ccw_vertices[0]
-            self.canvas.create_oval(x1-3, y1-3, x1+3, y1+3, outline=color, fill=color, tags=tag)
-            self.canvas.create_line(x1, y1, x2, y2, fill=color, tags=tag, width=2)
+        dots = len(ccw_vertices) < RASTER_MIN_POINTS
+        for kind, coords, options in hull_items(ccw_vertices, color, dots):
+            create = self.canvas.create_oval if kind == "oval" else self.canvas.create_line
+            create(*coords, tags=tag, **dict(options))
+
+
+    def show_cloud(self, groups=None, colors=None):
+        # Show the points as one image. groups (chan's partition) colors the
+        # points by group until show_cloud() is called again without them.
+        # With colors, the groups are drawn in those colors over all points.
+        if groups is None:
+            raster = self.cloud
+        elif colors is None:
+            raster = PointRaster(600, 600, radius=5)
+            for i, Si in enumerate(groups):
+                rgb = tuple(c >> 8 for c in self.canvas.winfo_rgb(COLORS[i % len(COLORS)]))
+                raster.stamp(Si, rgb)
+        else:
+            raster = PointRaster(600, 600)
+            raster.pixels[:] = self.cloud.pixels
+            for Si, color in zip(groups, colors):
+                raster.stamp(Si, tuple(c >> 8 for c in self.canvas.winfo_rgb(color)))
+        self.cloud_groups = groups
+        self.photo.configure(data=raster.ppm(), format="ppm")
+        if not self.canvas.find_withtag("cloud"):
+            self.canvas.create_image(0, 0, image=self.photo, anchor="nw", tags="cloud")
+            self.canvas.tag_lower("cloud")
+
+
+    def add_points(self, pts):
+        # pts: (n, 2) array-like of (x, y)
+        start = len(self.points)
+        self.points.extend(pts)
+        self.show_points(start)
+
+
+    def show_points(self, start):
+        # Draw the points stored from index start on and add them to the live
+        # hull. Few points are drawn as ovals, many go into the point image.
+        # Only the hull vertices of a batch can be vertices of the new hull, so
+        # larger batches insert just those.
+        P = self.points.array()
+        pts = P[start:]
+        new = pts if len(pts) < 3 else pts[hull_indices(pts)]
+        changed = False
+        for p in new.tolist():
+            changed = self.live.insert(p) or changed
+        if len(P) >= RASTER_MIN_POINTS:
+            if start < RASTER_MIN_POINTS:
+                self.canvas.delete("black")
+                self.cloud.stamp(P[:start], (0, 0, 0))
+            self.cloud.stamp(pts, (0, 0, 0))
+            self.show_cloud()
+        else:
+            for x, y in pts.tolist():
+                self.canvas.create_oval(x-3, y-3, x+3, y+3, fill="black", tags="black")
+        if changed:
+            self.draw_live()
 
-            # if i >= 4: break
+
+    def draw_live(self):
+        # current hull of all points, kept up to date as points are added
+        self.canvas.delete("live")
+        vertices = self.live.vertices()
+        if self.show_live.get() and len(vertices) > 1:
+            coords = np.concatenate([vertices, vertices[:1]]).ravel().tolist()
+            self.canvas.create_line(*coords, fill="orange", tags="live", width=1)
+            self.canvas.tag_lower("live")
+            self.canvas.tag_lower("cloud")
 
 
     def rand_event(self, n=20):   
-        for _ in range(n):
-            x, y = random.randint(15,585), random.randint(15,585)
-            self.canvas.create_oval(x-3, y-3, x+3, y+3, fill="black", tags="black")
-            self.points.append((x, y))
+        start = len(self.points)
+        self.points.random(n, 15, 585)
+        self.show_points(start)
 
 
     def click_event(self, event):
 
         if self.is_step_mode:
             messagebox.showwarning("Warning: Showing Step", "Finish the current demo process to add more points!")
-        self.canvas.create_oval(event.x-3, event.y-3, event.x+3, event.y+3, fill="black", tags="black")
-        self.points.append((event.x, event.y))
+        self.add_points([(event.x, event.y)])
 
     
     def ch_event(self, alg="gs"):
         if len(self.points) > 2:
             self.canvas.delete("ch")
-            pts = np.array(self.points)
+            pts = self.points.array()
+            stats = HullStats()
             
+            # The steps are computed in a worker thread and can be shown as
+            # soon as they arrive; poll_run() picks them up.
+            if alg == "gs":
+                compute = lambda on_step: graham_scan(pts, demo=True, stats=stats, on_step=on_step)
+            if alg == "chan":
+                compute = lambda on_step: chan(pts, demo=True, stats=stats, on_step=on_step)
+            if alg == "qh":
+                compute = lambda on_step: quickhull(pts, demo=True, stats=stats, on_step=on_step)
+            self.steps = None
+            self.available = 0
+            self.run_stats = stats
+            self.lbl_stats.config(text="")
+            self.run = DemoRun(compute)
+            self.btn_cancel.grid(row=2, column=1, sticky="n")
             if alg == "gs":
-                self.steps = self.graham_scan(pts, demo=True)
                 self.enter_gs_steps()
             if alg == "chan":
-                self.steps = self.chan(pts, demo=True)
                 self.enter_chan_steps()
+            if alg == "qh":
+                self.enter_qh_steps()
+            self.poll_run()
 
         else: 
             messagebox.showwarning(
@@ -180,17 +286,61 @@ class DisplayBoard:
             )
 
 
-    def gs_step_event(self, direction):
-
-        if self.current_step == len(self.steps) - 1 and direction == "next":
-            messagebox.showwarning("Warning: No More Steps", "Last step of algorithm!")
+    def poll_run(self):
+        # take in the steps the worker has computed since the last poll
+        if self.run is None:
             return
-        
+        for kind, value, n in self.run.poll():
+            if kind == "steps" or kind == "done":
+                self.steps, self.available = value, n
+            if kind == "done":
+                self.end_run(f"{n} steps")
+                # timings include recording the demo steps
+                self.lbl_stats.config(text=self.run_stats.summary())
+                return
+            if kind == "cancelled" or kind == "error":
+                self.end_run("cancelled" if kind == "cancelled" else "failed")
+                self.exit_steps(draw=False)
+                if kind == "error":
+                    messagebox.showerror("Error", str(value))
+                return
+        elapsed = time.perf_counter() - self.run.started
+        self.lbl_progress.config(text=f"computing... {self.available} steps, {elapsed:.1f} s")
+        self.win.after(30, self.poll_run)
+
+
+    def end_run(self, text):
+        self.run = None
+        self.btn_cancel.grid_forget()
+        self.lbl_progress.config(text=text)
+
+
+    def cancel_event(self):
+        # the worker stops at its next step, then poll_run() leaves the demo
+        if self.run is not None:
+            self.run.cancel()
+            self.lbl_progress.config(text="cancelling...")
+
+
+    def step_ready(self, direction):
+        # whether the next / previous step can be shown yet
+        if direction == "next" and self.current_step >= self.available - 1:
+            if self.run is not None:
+                messagebox.showwarning("Warning: Still Computing", "The next step is not computed yet!")
+            else:
+                messagebox.showwarning("Warning: No More Steps", "Last step of algorithm!")
+            return False
         if self.current_step == 0 and direction == "prev":
             messagebox.showwarning("Warning: No Previous Steps", "First step of algorithm!")
+            return False
+        return True
+
+
+    def gs_step_event(self, direction):
+
+        if not self.step_ready(direction):
             return
 
-        self.canvas.delete("steps")
         for lbl in self.lbl_gs:
             lbl.config(bg=self.bg)
 
@@ -199,60 +349,62 @@ class DisplayBoard:
         else:
             self.current_step -= 1
 
-        if self.current_step == 1:
+        # steps are rebuilt from a compact trace on demand, so fetch it once;
+        # the items are collected and only the ones that changed get redrawn
+        step = self.steps[self.current_step]
+        items = []
+        if self.current_step == 0:
+            self.lbl_gs[0].config(bg="yellow")
+
+        elif self.current_step == 1:
             self.lbl_gs[1].config(bg="yellow")
-            x, y = self.steps[1]
-            self.canvas.create_oval(x-10, y-10, x+10, y+10, outline="yellow", fill="yellow", tags="steps")
-            self.canvas.create_oval(x-3, y-3, x+3, y+3, outline="red", fill="red", tags="steps")
+            x, y = step
+            items.append(oval(x, y, 10, "yellow", "yellow"))
+            items.append(oval(x, y, 3, "red", "red"))
 
         elif self.current_step == 2:
             for i in range(2, 5):
                 self.lbl_gs[i].config(bg='yellow')
-            x1, y1 = self.steps[2][0]
-            x2, y2 = self.steps[2][1]
-            self.canvas.create_oval(x1-3, y1-3, x1+3, y1+3, outline="red", fill="red", tags="steps")
-            self.canvas.create_line(x1,y1,x2,y2, fill="red", tags="steps", width=2)
-            self.canvas.create_oval(x2-3, y2-3, x2+3, y2+3, outline="red", fill="red", tags="steps")
+            x1, y1 = step[0]
+            items.append(oval(x1, y1, 3, "red", "red"))
+            if len(step) > 1: # one point when all points are the same
+                x2, y2 = step[1]
+                items.append(line((x1, y1, x2, y2), "red"))
+                items.append(oval(x2, y2, 3, "red", "red"))
         
-        elif self.current_step == len(self.steps) - 1:
+        elif self.run is None and self.current_step == self.available - 1:
             self.lbl_gs[-1].config(bg="yellow")
-            self.draw_ch(self.steps[-1], tag="steps")
+            items += hull_items(step, "red")
 
         else:
             self.lbl_gs[5].config(bg="light yellow")
-            step = self.steps[self.current_step]
             stack = step[1]
             for i, (x, y) in enumerate(stack):
-                self.canvas.create_oval(x-3, y-3, x+3, y+3, outline="red", fill="red", tags="steps")
+                items.append(oval(x, y, 3, "red", "red"))
                 if i < len(stack) - 1:
                     x2, y2 = stack[i+1] 
-                    self.canvas.create_line(x, y, x2, y2, fill="red", tags="steps", width=2)
+                    items.append(line((x, y, x2, y2), "red"))
             if step[0] == "push":
                 x, y = stack[-1]
-                self.canvas.create_oval(x-3, y-3, x+3, y+3, outline="red", fill="red", tags="steps")
+                items.append(oval(x, y, 3, "red", "red"))
                 self.lbl_gs[8].config(bg="yellow")
             else:
                 corner = stack[-1]
                 test_pt = step[2]
-                self.canvas.create_oval(corner[0]-3, corner[1]-3, corner[0]+3, corner[1]+3, outline="blue", fill="blue", tags="steps")
-                self.canvas.create_line(corner[0], corner[1], test_pt[0], test_pt[1], dash=(4,2), fill="blue", tags="steps", width=2)
-                self.canvas.create_oval(test_pt[0]-3, test_pt[1]-3, test_pt[0]+3, test_pt[1]+3, outline="blue", fill="blue", tags="steps")
+                items.append(oval(corner[0], corner[1], 3, "blue", "blue"))
+                items.append(line((corner[0], corner[1], test_pt[0], test_pt[1]), "blue", dash=(4,2)))
+                items.append(oval(test_pt[0], test_pt[1], 3, "blue", "blue"))
                 if step[0] == "test":
                     self.lbl_gs[6].config(bg="yellow")
                 else:
                     self.lbl_gs[7].config(bg="yellow")
+        self.layer.draw(items)
 
     def chan_step_event(self, direction):
 
-        if self.current_step == len(self.steps) - 1 and direction == "next":
-            messagebox.showwarning("Warning: No More Steps", "Last step of algorithm!")
-            return
-        
-        if self.current_step == 0 and direction == "prev":
-            messagebox.showwarning("Warning: No Previous Steps", "First step of algorithm!")
+        if not self.step_ready(direction):
             return
                 
-        self.canvas.delete("steps")
         for lbl in self.lbl_chan:
             lbl.config(bg=self.bg)
 
@@ -262,6 +414,9 @@ class DisplayBoard:
             self.current_step -= 1
 
         step = self.steps[self.current_step]
+        items = []
+        if step[0] != 'partition' and self.cloud_groups is not None:
+            self.show_cloud()
         if step[0] == 'start':
             self.lbl_chan[0].config(text=self.chan_firstline, bg='yellow')
         elif step[0] == 't':
@@ -274,66 +429,65 @@ class DisplayBoard:
         elif step[0] == 'partition':
             self.lbl_chan[2].config(bg='light yellow')
             self.lbl_chan[4].config(bg='yellow')
-            for i, Si in enumerate(step[1]):
-                i %= len(COLORS)
-                for x, y in Si:
-                    self.canvas.create_oval(x-5, y-5, x+5, y+5, outline=COLORS[i], fill=COLORS[i], tag='steps')
+            if len(self.points) >= RASTER_MIN_POINTS:
+                self.show_cloud(step[1])
+            else:
+                for i, Si in enumerate(step[1]):
+                    i %= len(COLORS)
+                    for x, y in Si:
+                        items.append(oval(x, y, 5, COLORS[i], COLORS[i]))
         elif step[0] == 'convex_hulls':
             self.lbl_chan[2].config(bg='light yellow')
             self.lbl_chan[5].config(bg='light yellow')
             self.lbl_chan[6].config(bg='yellow')
             for i, Hi in enumerate(step[1]):
-                i %= len(COLORS)
-                self.draw_ch(Hi, tag="steps", color=COLORS[i])
+                items += hull_items(Hi, COLORS[i % len(COLORS)])
         elif step[0] == 'start_wrap':
             self.lbl_chan[2].config(bg='light yellow')
             self.lbl_chan[7].config(bg='yellow')
             for i, Hi in enumerate(step[1]):
-                i %= len(COLORS)
-                self.draw_ch(Hi, tag="steps", color=COLORS[i])
+                items += hull_items(Hi, COLORS[i % len(COLORS)])
             x, y = step[2]
-            self.canvas.create_oval(x-10, y-10, x+10, y+10, outline='black', fill='yellow', tag='steps')
-            self.canvas.create_oval(x-3, y-3, x+3, y+3, outline='red', fill='red', tag='steps')
+            items.append(oval(x, y, 10, 'black', 'yellow'))
+            items.append(oval(x, y, 3, 'red', 'red'))
         elif step[0] == 'candidates':
             for i in [2,8,9]:
                 self.lbl_chan[i].config(bg='light yellow')
             for i in range(10, 12):
                 self.lbl_chan[i].config(bg='yellow')
             for i, Hi in enumerate(step[1]):
-                i %= len(COLORS)
-                self.draw_ch(Hi, tag="steps", color=COLORS[i])
+                items += hull_items(Hi, COLORS[i % len(COLORS)])
             for i, (x, y) in enumerate(step[3]):
-                self.canvas.create_oval(x-3, y-3, x+3, y+3, outline='red', fill='red', tag='steps')
+                items.append(oval(x, y, 3, 'red', 'red'))
                 if i < len(step[3]) - 1:
                     x2, y2 = step[3][i+1]  
-                    self.canvas.create_line(x, y, x2, y2, fill='red', tags='steps', width=2)
+                    items.append(line((x, y, x2, y2), 'red'))
             for i, (x, y) in enumerate(step[2]):
-                self.canvas.create_oval(x-10, y-10, x+10, y+10, outline='black', fill='yellow', tag='steps')
-                self.canvas.create_oval(x-3, y-3, x+3, y+3, outline='blue', fill='blue', tag='steps')
+                items.append(oval(x, y, 10, 'black', 'yellow'))
+                items.append(oval(x, y, 3, 'blue', 'blue'))
             x, y = step[3][-1]
-            self.canvas.create_oval(x-10, y-10, x+10, y+10, outline='black', fill='yellow', tag='steps')
-            self.canvas.create_oval(x-3, y-3, x+3, y+3, outline='red', fill='red', tag='steps')
+            items.append(oval(x, y, 10, 'black', 'yellow'))
+            items.append(oval(x, y, 3, 'red', 'red'))
         elif step[0] == 'chosen': # ('chosen', H.copy(), q.copy(), [pt.copy() for pt in hull], pi.copy())
             self.lbl_chan[2].config(bg='light yellow')
             self.lbl_chan[8].config(bg='light yellow')
             self.lbl_chan[12].config(bg='yellow')
             self.lbl_chan[13].config(bg='yellow')
             for i, Hi in enumerate(step[1]):
-                i %= len(COLORS)
-                self.draw_ch(Hi, tag="steps", color=COLORS[i])
+                items += hull_items(Hi, COLORS[i % len(COLORS)])
             for i, (x, y) in enumerate(step[3]):
-                self.canvas.create_oval(x-3, y-3, x+3, y+3, outline='red', fill='red', tag='steps')
+                items.append(oval(x, y, 3, 'red', 'red'))
                 if i < len(step[3]) - 1:
                     x2, y2 = step[3][i+1]  
-                    self.canvas.create_line(x, y, x2, y2, fill='red', tags='steps', width=2)
+                    items.append(line((x, y, x2, y2), 'red'))
             for i, (x, y) in enumerate(step[2]):
                 x2, y2 = step[3][-1]
-                self.canvas.create_oval(x-3, y-3, x+3, y+3, outline='blue', fill='blue', tag='steps')
-                self.canvas.create_line(x,y,x2,y2, dash=(4,2), fill='blue', width=2, tags='steps' )
+                items.append(oval(x, y, 3, 'blue', 'blue'))
+                items.append(line((x, y, x2, y2), 'blue', dash=(4,2)))
             x, y = step[4]
             x2, y2 = step[3][-1]
-            self.canvas.create_oval(x-3, y-3, x+3, y+3, outline='red', fill='red', tag='steps')
-            self.canvas.create_line(x,y,x2,y2, fill='red', width=2, tags='steps' )
+            items.append(oval(x, y, 3, 'red', 'red'))
+            items.append(line((x, y, x2, y2), 'red'))
         elif step[0] == 'hull':
             if direction == 'prev':
                 self.lbl_chan[0].config(text=self.chan_firstline + f" // t: {step[3][0]}, m: {step[3][1]}, r: {step[3][2]}")
@@ -341,29 +495,110 @@ class DisplayBoard:
             self.lbl_chan[8].config(bg='light yellow')
             self.lbl_chan[14].config(bg='yellow')
             for i, Hi in enumerate(step[1]):
-                i %= len(COLORS)
-                self.draw_ch(Hi, tag="steps", color=COLORS[i])
+                items += hull_items(Hi, COLORS[i % len(COLORS)])
             for i, (x, y) in enumerate(step[2]):
                 if i == 0 or i == len(step[2]) - 1:
-                    self.canvas.create_oval(x-10, y-10, x+10, y+10, outline='black', fill='yellow', tag='steps') 
-                self.canvas.create_oval(x-3, y-3, x+3, y+3, outline='red', fill='red', tag='steps')
+                    items.append(oval(x, y, 10, 'black', 'yellow'))
+                items.append(oval(x, y, 3, 'red', 'red'))
                 if i < len(step[2]) - 1:
                     x2, y2 = step[2][i+1]  
-                    self.canvas.create_line(x, y, x2, y2, fill='red', tags='steps', width=2)
+                    items.append(line((x, y, x2, y2), 'red'))
         elif step[0] == 'final':
             self.lbl_chan[2].config(bg='light yellow')
             self.lbl_chan[15].config(bg='yellow')
             for i, Hi in enumerate(step[1]):
-                i %= len(COLORS)
-                self.draw_ch(Hi, tag="steps", color=COLORS[i])
-            for i, (x, y) in enumerate(step[2]):
-                self.canvas.create_oval(x-3, y-3, x+3, y+3, outline='red', fill='red', tag='steps')
-                x2, y2 = step[2][i+1]  if i < len(step[2]) - 1 else step[2][0]
-                self.canvas.create_line(x, y, x2, y2, fill='red', tags='steps', width=2)
+                items += hull_items(Hi, COLORS[i % len(COLORS)])
+            items += hull_items(step[2], 'red')
         else: # step[0] == 'increment'
             self.lbl_chan[0].config(text=self.chan_firstline + f" // t: {step[1]}" , bg=self.bg)
             self.lbl_chan[2].config(bg='light yellow')
             self.lbl_chan[16].config(bg='yellow')
+        self.layer.draw(items)
+        
+
+    def mark_points(self, groups, colors, items):
+        # highlight groups of points: as ovals, or with many points by
+        # redrawing the point image with the groups in color
+        if len(self.points) >= RASTER_MIN_POINTS:
+            self.show_cloud(groups, colors)
+            return
+        if self.cloud_groups is not None:
+            self.show_cloud()
+        for Si, color in zip(groups, colors):
+            for x, y in Si.tolist():
+                items.append(oval(x, y, 3, color, color))
+
+    def qh_step_event(self, direction):
+
+        if not self.step_ready(direction):
+            return
+
+        for lbl in self.lbl_qh:
+            lbl.config(bg=self.bg)
+
+        if direction == "next":
+            self.current_step += 1
+        else:
+            self.current_step -= 1
+
+        step = self.steps[self.current_step]
+        items = []
+        if step[0] in ('edge', 'farthest'):
+            self.mark_points([step[4]], ['blue'], items)
+        elif step[0] == 'split':
+            self.mark_points([step[5], step[6]], ['blue', 'dark orange'], items)
+        elif self.cloud_groups is not None:
+            self.show_cloud()
+
+        if step[0] == 'start':
+            self.lbl_qh[0].config(bg='yellow')
+        elif step[0] == 'extremes':
+            for i in range(1, 5):
+                self.lbl_qh[i].config(bg='yellow')
+            (x, y), (x2, y2) = step[1], step[2]
+            items.append(line((x, y, x2, y2), 'red'))
+            for x, y in (step[1], step[2]):
+                items.append(oval(x, y, 10, 'black', 'yellow'))
+                items.append(oval(x, y, 3, 'red', 'red'))
+        elif step[0] == 'edge': # ('edge', hull, p, q, X)
+            self.lbl_qh[5].config(bg='light yellow')
+            self.lbl_qh[6].config(bg='yellow')
+            items += hull_items(step[1], 'red')
+            (x, y), (x2, y2) = step[2], step[3]
+            items.append(line((x, y, x2, y2), 'blue'))
+        elif step[0] == 'farthest': # ('farthest', hull, p, q, X, c)
+            for i in [5, 9]:
+                self.lbl_qh[i].config(bg='light yellow')
+            self.lbl_qh[10].config(bg='yellow')
+            items += hull_items(step[1], 'red')
+            (x, y), (x2, y2), (cx, cy) = step[2], step[3], step[5]
+            items.append(line((x, y, x2, y2), 'blue'))
+            items.append(line((x, y, cx, cy), 'blue', dash=(4,2)))
+            items.append(line((cx, cy, x2, y2), 'blue', dash=(4,2)))
+            items.append(oval(cx, cy, 10, 'black', 'yellow'))
+            items.append(oval(cx, cy, 3, 'blue', 'blue'))
+        elif step[0] == 'split': # ('split', hull, p, c, q, X1, X2)
+            for i in [5, 9]:
+                self.lbl_qh[i].config(bg='light yellow')
+            for i in [11, 12]:
+                self.lbl_qh[i].config(bg='yellow')
+            items += hull_items(step[1], 'red')
+            (x, y), (cx, cy), (x2, y2) = step[2], step[3], step[4]
+            items.append(line((x, y, cx, cy), 'blue'))
+            items.append(line((cx, cy, x2, y2), 'dark orange'))
+            items.append(oval(cx, cy, 3, 'red', 'red'))
+        elif step[0] == 'vertex': # ('vertex', hull, p, q)
+            self.lbl_qh[5].config(bg='light yellow')
+            for i in [7, 8]:
+                self.lbl_qh[i].config(bg='yellow')
+            items += hull_items(step[1], 'red')
+            x, y = step[2]
+            items.append(oval(x, y, 10, 'black', 'yellow'))
+            items.append(oval(x, y, 3, 'red', 'red'))
+        else: # step[0] == 'final'
+            self.lbl_qh[13].config(bg='yellow')
+            items += hull_items(step[1], 'red')
+        self.layer.draw(items)
         
 
     def enter_gs_steps(self):
@@ -371,6 +606,7 @@ class DisplayBoard:
         self.btn_rand.grid_forget()
         self.btn_gs.grid_forget()
         self.btn_chan.grid_forget()
+        self.btn_qh.grid_forget()
         self.btn_prev.grid(row=0, column=0, sticky="n")
         self.btn_next.grid(row=0, column=1, sticky="n")
         self.btn_finish.grid(row=0, column=2, sticky="n")
@@ -384,6 +620,7 @@ class DisplayBoard:
         self.btn_rand.grid_forget()
         self.btn_gs.grid_forget()
         self.btn_chan.grid_forget()
+        self.btn_qh.grid_forget()
         self.btn_prev2.grid(row=0, column=0, sticky="n")
         self.btn_next2.grid(row=0, column=1, sticky="n")
         self.btn_finish2.grid(row=0, column=2, sticky="n")
@@ -392,9 +629,34 @@ class DisplayBoard:
         for i, lbl in enumerate(self.lbl_chan):
             lbl.grid(row=i, column=0, sticky="w")
 
+    def enter_qh_steps(self):
+        self.is_step_mode = True
+        self.current_alg = "qh"
+        self.btn_rand.grid_forget()
+        self.btn_gs.grid_forget()
+        self.btn_chan.grid_forget()
+        self.btn_qh.grid_forget()
+        self.btn_prev3.grid(row=0, column=0, sticky="n")
+        self.btn_next3.grid(row=0, column=1, sticky="n")
+        self.btn_finish3.grid(row=0, column=2, sticky="n")
+        self.lbl_qh[0].config(bg="yellow")
+        for i, lbl in enumerate(self.lbl_qh):
+            lbl.grid(row=i, column=0, sticky="w")
+
 
-    def exit_gs_steps(self):
+    def exit_steps(self, draw=True):
+        if self.current_alg == 'chan':
+            self.exit_chan_steps(draw)
+        elif self.current_alg == 'qh':
+            self.exit_qh_steps(draw)
+        else:
+            self.exit_gs_steps(draw)
+
+    def exit_gs_steps(self, draw=True):
 
+        if draw and self.run is not None:
+            messagebox.showwarning("Warning: Still Computing", "Wait for the last step or cancel the demo!")
+            return
         self.is_step_mode = False
         self.current_step = 0
 
@@ -404,9 +666,11 @@ class DisplayBoard:
         self.btn_rand.grid(row=0, column=0, sticky="n")
         self.btn_gs.grid(row=0, column=1, sticky="n")
         self.btn_chan.grid(row=0, column=2, sticky="n")
+        self.btn_qh.grid(row=0, column=3, sticky="n")
         
-        self.canvas.delete("steps")
-        self.draw_ch(self.steps[-1])
+        self.layer.clear()
+        if draw:
+            self.draw_ch(self.steps[-1])
 
         self.steps = None
 
@@ -414,8 +678,11 @@ class DisplayBoard:
             lbl.config(bg=self.bg)
             lbl.grid_forget()
     
-    def exit_chan_steps(self):
+    def exit_chan_steps(self, draw=True):
         
+        if draw and self.run is not None:
+            messagebox.showwarning("Warning: Still Computing", "Wait for the last step or cancel the demo!")
+            return
         self.is_step_mode = False
         self.current_alg = ''
         self.current_step = 0
@@ -426,9 +693,13 @@ class DisplayBoard:
         self.btn_rand.grid(row=0, column=0, sticky="n")
         self.btn_gs.grid(row=0, column=1, sticky="n")
         self.btn_chan.grid(row=0, column=2, sticky="n")
+        self.btn_qh.grid(row=0, column=3, sticky="n")
         
-        self.canvas.delete("steps")
-        self.draw_ch(self.steps[-1][-1])
+        self.layer.clear()
+        if self.cloud_groups is not None:
+            self.show_cloud()
+        if draw:
+            self.draw_ch(self.steps[-1][-1])
 
         self.steps = None
 
@@ -438,93 +709,79 @@ class DisplayBoard:
 
         self.lbl_chan[0].config(text=self.chan_firstline)
 
+    def exit_qh_steps(self, draw=True):
 
-    def reset_event(self):
-        if self.is_step_mode:
-            if self.current_alg=='chan': 
-                self.exit_chan_steps()
-            else:
-                self.exit_gs_steps()
-        self.points = []
-        self.canvas.delete("all")
-
+        if draw and self.run is not None:
+            messagebox.showwarning("Warning: Still Computing", "Wait for the last step or cancel the demo!")
+            return
+        self.is_step_mode = False
+        self.current_alg = ''
+        self.current_step = 0
 
-    def close_event(self):
-        self.win.destroy()
+        self.btn_prev3.grid_forget()
+        self.btn_next3.grid_forget()
+        self.btn_finish3.grid_forget()
+        self.btn_rand.grid(row=0, column=0, sticky="n")
+        self.btn_gs.grid(row=0, column=1, sticky="n")
+        self.btn_chan.grid(row=0, column=2, sticky="n")
+        self.btn_qh.grid(row=0, column=3, sticky="n")
 
+        self.layer.clear()
+        if self.cloud_groups is not None:
+            self.show_cloud()
+        if draw:
+            self.draw_ch(self.steps[-1][-1])
 
-    def graham_scan(self, pts, demo=False):
-        # input: np array of shape (n, 2) where n is the # of pts
-        # output: ccw convex hull vertices
+        self.steps = None
 
-        # Get a boundary pt
-        boundary_pt = pts[np.argmax(pts[:, 1])]
-        if demo: steps = ['start', boundary_pt]
+        for lbl in self.lbl_qh:
+            lbl.config(bg=self.bg)
+            lbl.grid_forget()
 
-        # Sort radially w/ respect to boundary pt
-        angles = np.arctan2( pts[:, 1] - boundary_pt[1], pts[:, 0] - boundary_pt[0])
-        pts = pts[np.argsort(angles)[::-1]]
 
-        # Initialize stack
-        stack = [pts[0], pts[1]]
-        if demo: steps.append(stack.copy())
+    def save_event(self):
+        path = filedialog.asksaveasfilename(defaultextension=".npy", filetypes=[("NumPy arrays", "*.npy")])
+        if path:
+            self.points.save(path)
 
-        for pt in pts[2:]:
-            if demo: steps.append(("test", stack.copy(), pt))
 
-            while len(stack) >= 2 and orient(stack[-2], stack[-1], pt) <= 0:
-                stack.pop()
-                if demo: steps.append(("popped", stack.copy(), pt))
+    def load_event(self):
+        # replace the points with the ones in a .npy file
+        if self.is_step_mode:
+            messagebox.showwarning("Warning: Showing Step", "Finish the current demo process to load points!")
+            return
+        path = filedialog.askopenfilename(filetypes=[("NumPy arrays", "*.npy")])
+        if not path:
+            return
+        self.reset_event()
+        try:
+            self.points.load(path)
+        except ValueError as e:
+            messagebox.showwarning("Warning: Cannot Load Points", str(e))
+            return
+        self.show_points(0)
 
-            stack.append(pt)
-            if demo: steps.append(("push", stack.copy()))
-        
-        if demo: steps.append(stack.copy())
 
-        return steps if demo else np.array(stack)
-    
+    def reset_event(self):
+        if self.run is not None:
+            self.run.cancel()
+            self.end_run("")
+        if self.is_step_mode:
+            self.exit_steps(draw=False)
+        self.points.clear()
+        self.live = IncrementalHull()
+        self.lbl_stats.config(text="")
+        self.cloud.clear()
+        self.cloud_groups = None
+        self.layer.clear()
+        self.canvas.delete("all")
 
 
-    def chan(self, pts, demo=False):
-        # input: np array of shape (n, 2) where n is the # of pts
-        # output: ccw convex hull vertices
-        if demo: steps = [('start', None)]
+    def close_event(self):
+        if self.run is not None:
+            self.run.cancel()
+        self.win.destroy()
 
-        n = len(pts)
-        t = 1
-        if demo: steps.append(('t',t))
-        while True: 
-            m = min(n, 2**(2**t))
-            r = math.ceil(n / m)
-            if demo: steps.append(('m', (t, m, r)))
-            
-            H = partition(pts, r)
-            if demo: steps.append(('partition', H.copy()))
-            
-            H = [self.graham_scan(np.array(S)) for S in H]
-            if demo: steps.append(('convex_hulls', H.copy()))
-            
-            p0 = np.array([-1, 0])
-            p1 = pts[np.argmax(pts[:, 1])]
-            hull = [p1]
-            if demo: steps.append(('start_wrap', H.copy(), p1.copy()))
-            
-            for _ in range(2, m+2):
-                q = [Hj[np.argmax(np.array([angle(p0, p1, pt) for pt in Hj]))] for Hj in H]
-                if demo: steps.append(('candidates', H.copy(), q.copy(), [pt.copy() for pt in hull]))
-                
-                pi = q[np.argmax(np.array([angle(p0, p1, pt) for pt in q ]))] 
-                if demo: steps.append(('chosen', H.copy(), q.copy(), [pt.copy() for pt in hull], pi.copy()))
-                
-                hull.append(pi)
-                if demo: steps.append(('hull', H.copy(), [pt.copy() for pt in hull], (t, m, r)))
-                
-                if np.all(hull[0] == pi):
-                    if demo: steps.append(('final', H.copy(), [pt.copy() for pt in hull][:-1]))
-                    return steps if demo else hull[:-1]
-                p0, p1 = p1, pi
-            t += 1
-            if demo: steps.append(('increment', t))
 
 if __name__ == "__main__":
     
@@ -0,0 +1,61 @@
+import queue
+import threading
+import time
+
+
+# Runs a demo computation in a worker thread so the GUI stays responsive.
+# The computation records its trace through on_step (see steps.py); every few
+# steps the worker puts ("steps", trace, n) on a queue, meaning steps 0..n-1
+# can be shown. The GUI drains the queue with poll() from a Tk after() timer.
+# A run ends with one ("done", trace, n), ("cancelled", None, 0) or
+# ("error", exception, 0) message.
+
+
+class Cancelled(Exception):
+    pass
+
+
+class DemoRun:
+
+    def __init__(self, compute, interval=0.05):
+        # compute(on_step) runs the algorithm and returns its trace
+        self.messages = queue.Queue()
+        self.interval = interval # seconds between "steps" messages
+        self.started = time.perf_counter()
+        self._cancel = threading.Event()
+        self._last = 0.0
+        self.thread = threading.Thread(target=self._run, args=(compute,), daemon=True)
+        self.thread.start()
+
+    def _on_step(self, trace):
+        if self._cancel.is_set():
+            raise Cancelled()
+        n = len(trace)
+        now = time.perf_counter()
+        # the first steps go out right away, the rest at most every interval
+        if n <= 3 or now - self._last >= self.interval:
+            self.messages.put(("steps", trace, n))
+            self._last = now
+
+    def _run(self, compute):
+        try:
+            trace = compute(self._on_step)
+        except Cancelled:
+            self.messages.put(("cancelled", None, 0))
+        except Exception as e:
+            self.messages.put(("error", e, 0))
+        else:
+            self.messages.put(("done", trace, len(trace)))
+
+    def cancel(self):
+        # the worker stops at its next recorded step
+        self._cancel.set()
+
+    def poll(self):
+        # all messages that arrived since the last poll
+        out = []
+        while True:
+            try:
+                out.append(self.messages.get_nowait())
+            except queue.Empty:
+                return out
@@ -0,0 +1,41 @@
+import argparse
+import time
+import numpy as np
+
+from hull import hull_indices, hull_indices_batch
+
+
+# Hulls of many small point groups: one hull_indices_batch() call on the
+# ragged layout versus a Python loop of hull_indices() calls, one per group.
+#
+#   $ python -m benchmarks.batch_groups --groups 100000 --min-size 10 --max-size 200
+
+
+def main():
+    parser = argparse.ArgumentParser(description="batched versus per-group hulls of many small groups")
+    parser.add_argument("--groups", type=int, default=100_000)
+    parser.add_argument("--min-size", type=int, default=10)
+    parser.add_argument("--max-size", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    sizes = rng.integers(args.min_size, args.max_size + 1, args.groups)
+    offsets = np.r_[0, np.cumsum(sizes)]
+    pts = rng.random((offsets[-1], 2)) * 1000.0
+
+    start = time.perf_counter()
+    idx, hull_offsets = hull_indices_batch(pts, offsets)
+    t_batch = time.perf_counter() - start
+
+    start = time.perf_counter()
+    loop = [offsets[g] + hull_indices(pts[offsets[g]:offsets[g+1]]) for g in range(args.groups)]
+    t_loop = time.perf_counter() - start
+
+    assert np.array_equal(idx, np.concatenate(loop))
+    print(f"{args.groups} groups, {len(pts)} points, {len(idx)} hull vertices")
+    print(f"batch {t_batch:.3f} s, loop {t_loop:.3f} s, speedup {t_loop / t_batch:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+import argparse
+import os
+import time
+import numpy as np
+
+from hull import chan
+
+
+# Speedup of chan(workers=k) over the serial run. Only the sub-hulls of the
+# first round, the one that sees all n points, are built in the pool, so the
+# speedup is bounded by how much of the run that phase takes.
+#
+#   $ python -m benchmarks.chan_parallel --n 1000000 --workers 1 2 4 8
+
+
+def main():
+    parser = argparse.ArgumentParser(description="chan() speedup versus worker count")
+    parser.add_argument("--n", type=int, default=1_000_000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    pts = rng.random((args.n, 2)) * 1000.0
+    print(f"n = {args.n}, {os.cpu_count()} CPUs")
+    print(f"{'workers':>8} {'time s':>9} {'speedup':>8}")
+    base = None
+    for k in args.workers:
+        best = float("inf")
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            chan(pts.copy(), workers=k)
+            best = min(best, time.perf_counter() - start)
+        base = base or best
+        print(f"{k:>8} {best:>9.3f} {base / best:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
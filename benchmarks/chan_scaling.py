@@ -0,0 +1,56 @@
+import argparse
+import math
+import time
+import numpy as np
+
+from hull import chan, graham_scan
+
+
+# Output-sensitivity of chan(): n stays fixed while the number of hull
+# vertices h grows. h evenly spaced points sit on a circle and the rest are
+# scattered well inside it, so the hull size is known exactly.
+#
+#   $ python -m benchmarks.chan_scaling --n 20000
+
+
+def circle_with_interior(n, h, rng):
+    a = (rng.random() + np.arange(h)) * 2 * np.pi / h
+    rim = np.c_[np.cos(a), np.sin(a)] * 1000.0
+    r = np.sqrt(rng.random(n - h)) * 500.0
+    b = rng.random(n - h) * 2 * np.pi
+    inner = np.c_[r * np.cos(b), r * np.sin(b)]
+    pts = np.concatenate([rim, inner])
+    rng.shuffle(pts)
+    return pts
+
+
+def best_time(fn, pts, repeat):
+    best = math.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        out = fn(pts.copy())
+        best = min(best, time.perf_counter() - start)
+    return best, len(out)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="chan() running time as the hull size grows")
+    parser.add_argument("--n", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    hs = [h for h in [4, 16, 64, 256, 1024, 4096, 16384, 65536] if h <= args.n]
+    print(f"{'n':>8} {'h':>7} {'chan s':>9} {'us/(n log2 h)':>14} {'graham fast s':>14}")
+    for h in hs:
+        pts = circle_with_interior(args.n, h, rng)
+        t_chan, h_out = best_time(chan, pts, args.repeat)
+        t_gs, _ = best_time(lambda p: graham_scan(p, fast=True), pts, args.repeat)
+        assert h_out == h
+        norm = t_chan / (args.n * math.log2(h)) * 1e6
+        print(f"{args.n:>8} {h:>7} {t_chan:>9.4f} {norm:>14.4f} {t_gs:>14.4f}")
+
+
+if __name__ == "__main__":
+    main()
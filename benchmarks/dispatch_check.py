@@ -0,0 +1,53 @@
+import argparse
+import json
+import sys
+import numpy as np
+
+from benchmarks.suite import DISTRIBUTIONS
+from dispatch import PROFILE_PATH, choose, fit_profile
+
+
+# Checks the engine choose() picks on the inputs of a benchmarks/suite.py run
+# against the engine that was fastest there: the time the run recorded for
+# the choice may be at most --tolerance times the fastest time. The inputs are
+# regenerated from the run's distributions, sizes and seed, and the profile is
+# fitted to the same run, so this tests the cost model and the sample
+# estimates rather than the machine. Exits 1 if any input fails.
+#
+#   $ python -m benchmarks.dispatch_check
+#   $ python -m benchmarks.dispatch_check --results new.json --tolerance 1.5
+
+
+def main():
+    parser = argparse.ArgumentParser(description="auto's engine choices versus the recorded fastest engines")
+    parser.add_argument("--results", default=PROFILE_PATH, help="benchmarks/suite.py output")
+    parser.add_argument("--tolerance", type=float, default=1.25)
+    parser.add_argument("--min-n", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=0, help="the --seed the suite ran with")
+    args = parser.parse_args()
+
+    with open(args.results) as f:
+        results = json.load(f)["results"]
+    profile = fit_profile(results, args.min_n)
+    cells = {}
+    for r in results:
+        if r["n"] >= args.min_n and r["algorithm"] in profile["engines"]:
+            cells.setdefault((r["distribution"], r["n"]), {})[r["algorithm"]] = r["seconds"]
+
+    print(f"{'distribution':<15} {'n':>8} {'chosen':<16} {'time s':>8} {'fastest':<16} {'time s':>8} {'ratio':>6}")
+    failed = 0
+    for (dist, n), seconds in sorted(cells.items()):
+        pts = DISTRIBUTIONS[dist](n, np.random.default_rng(args.seed))
+        engine = choose(pts, profile)[0]
+        fastest = min(seconds, key=seconds.get)
+        ratio = seconds[engine] / seconds[fastest]
+        mark = "" if ratio <= args.tolerance else "  FAIL"
+        failed += bool(mark)
+        print(f"{dist:<15} {n:>8} {engine:<16} {seconds[engine]:>8.4f} {fastest:<16} "
+              f"{seconds[fastest]:>8.4f} {ratio:>6.2f}{mark}")
+    print(f"{failed} of {len(cells)} choices more than {args.tolerance}x slower than the fastest")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+import argparse
+import time
+from collections import deque
+import numpy as np
+
+from hull import graham_scan
+from window import WindowHull
+
+
+# Hull of the last --window points of a stream, read after every new point:
+# WindowHull's amortized updates versus running graham_scan(fast=True) on the
+# whole window again at every tick. --walk streams a random walk, like
+# telemetry, instead of uniform points.
+#
+#   $ python -m benchmarks.sliding_window --points 20000 --window 5000
+
+
+def stream(n, walk, rng):
+    if walk:
+        return np.cumsum(rng.normal(size=(n, 2)), axis=0)
+    return rng.random((n, 2)) * 1000.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="sliding-window hull versus recomputing every window")
+    parser.add_argument("--points", type=int, default=20_000)
+    parser.add_argument("--window", type=int, default=5000)
+    parser.add_argument("--walk", action="store_true", help="stream a random walk instead of uniform points")
+    parser.add_argument("--check-every", type=int, default=1000, help="compare the two hulls every this many ticks")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    pts = stream(args.points, args.walk, np.random.default_rng(args.seed))
+
+    hulls = {}
+    w = WindowHull(args.window)
+    start = time.perf_counter()
+    for i, p in enumerate(pts):
+        w.append(p)
+        hull = w.vertices()
+        if i % args.check_every == 0:
+            hulls[i] = hull
+    t_window = time.perf_counter() - start
+
+    recent = deque(maxlen=args.window)
+    start = time.perf_counter()
+    for i, p in enumerate(pts):
+        recent.append(p)
+        hull = graham_scan(np.array(recent), fast=True)
+        if i % args.check_every == 0:
+            assert np.array_equal(hull, hulls[i]), f"hulls differ at tick {i}"
+    t_recompute = time.perf_counter() - start
+
+    print(f"{args.points} points, window {args.window}, {len(hull)} hull vertices at the end")
+    print(f"window hull {t_window:.3f} s ({t_window / args.points * 1e6:.1f} us/tick), "
+          f"recompute {t_recompute:.3f} s ({t_recompute / args.points * 1e6:.1f} us/tick), "
+          f"speedup {t_recompute / t_window:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
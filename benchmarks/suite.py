@@ -0,0 +1,167 @@
+import argparse
+import datetime
+import json
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+import numpy as np
+
+from dispatch import auto
+from hull import chan, graham_scan, quickhull
+from stats import HullStats
+
+
+# Benchmark matrix: every algorithm on every point distribution and size.
+# Each cell records the best wall time, the peak traced memory (from a separate
+# run, since tracemalloc slows everything down), the hull size and the number
+# of orientation tests. Results go to a JSON file; --compare prints the ratio
+# against an earlier file, e.g. one written on another commit.
+#
+#   $ python -m benchmarks.suite --output new.json
+#   $ python -m benchmarks.suite --sizes 100 10000 1000000 --compare old.json
+#
+# Once one cell takes longer than --max-seconds, the larger sizes of that
+# algorithm and distribution are skipped.
+
+
+def uniform_square(n, rng):
+    return rng.random((n, 2)) * 1000.0
+
+
+def uniform_disk(n, rng):
+    r = np.sqrt(rng.random(n)) * 500.0
+    a = rng.random(n) * 2 * np.pi
+    return np.c_[r * np.cos(a), r * np.sin(a)]
+
+
+def gaussian(n, rng):
+    return rng.normal(0.0, 100.0, (n, 2))
+
+
+def circle(n, rng):
+    # every point is a hull vertex, h = n
+    a = rng.random(n) * 2 * np.pi
+    return np.c_[np.cos(a), np.sin(a)] * 1000.0
+
+
+def integer_grid(n, rng):
+    # small integer grid: many duplicates and long collinear runs on the hull
+    side = max(2, int(np.sqrt(n) / 2))
+    return rng.integers(0, side, (n, 2)).astype(np.int64)
+
+
+DISTRIBUTIONS = {
+    "uniform_square": uniform_square,
+    "uniform_disk": uniform_disk,
+    "gaussian": gaussian,
+    "circle": circle,
+    "integer_grid": integer_grid,
+}
+
+ALGORITHMS = {
+    "graham": lambda pts, s: graham_scan(pts, stats=s),
+    "graham_fast": lambda pts, s: graham_scan(pts, fast=True, stats=s),
+    "graham_fast_pf8": lambda pts, s: graham_scan(pts, fast=True, prefilter=8, stats=s),
+    "chan": lambda pts, s: chan(pts, stats=s),
+    "chan_pf8": lambda pts, s: chan(pts, prefilter=8, stats=s),
+    "quickhull": lambda pts, s: quickhull(pts, stats=s),
+    "auto": lambda pts, s: auto(pts, stats=s),
+}
+
+DEFAULT_SIZES = [10**2, 10**3, 10**4, 10**5, 10**6, 10**7]
+
+
+def run_cell(fn, pts, repeat, memory):
+    best = float("inf")
+    for _ in range(repeat):
+        stats = HullStats()
+        data = pts.copy()
+        start = time.perf_counter()
+        out = fn(data, stats)
+        best = min(best, time.perf_counter() - start)
+    cell = {"seconds": best, "h": len(out), "orient_tests": stats.orient_tests, "culled": stats.culled}
+    if memory:
+        data = pts.copy()
+        tracemalloc.start()
+        fn(data, HullStats())
+        cell["peak_bytes"] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return cell
+
+
+def metadata():
+    try:
+        rev = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                             text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        rev = None
+    return {
+        "commit": rev,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "time": datetime.datetime.now().isoformat(timespec="seconds"),
+    }
+
+
+def compare(results, old):
+    base = {(r["algorithm"], r["distribution"], r["n"]): r for r in old["results"]}
+    print(f"\nagainst {old['meta'].get('commit')} (ratio new/old, < 1 is faster)")
+    print(f"{'algorithm':>16} {'distribution':>15} {'n':>9} {'time':>7} {'tests':>7} {'memory':>7}")
+    for r in results:
+        o = base.get((r["algorithm"], r["distribution"], r["n"]))
+        if o is None:
+            continue
+        ratios = []
+        for key in ("seconds", "orient_tests", "peak_bytes"):
+            if r.get(key) and o.get(key):
+                ratios.append(f"{r[key] / o[key]:>7.2f}")
+            else:
+                ratios.append(f"{'-':>7}")
+        print(f"{r['algorithm']:>16} {r['distribution']:>15} {r['n']:>9} {' '.join(ratios)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="convex hull benchmark matrix with JSON output")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--algorithms", nargs="+", choices=list(ALGORITHMS), default=list(ALGORITHMS))
+    parser.add_argument("--distributions", nargs="+", choices=list(DISTRIBUTIONS), default=list(DISTRIBUTIONS))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--max-seconds", type=float, default=10.0,
+                        help="skip larger sizes once a run takes longer than this")
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc run")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-o", "--output", help="write the results to this JSON file")
+    parser.add_argument("--compare", help="JSON file of an earlier run to compare against")
+    args = parser.parse_args()
+
+    results = []
+    print(f"{'algorithm':>16} {'distribution':>15} {'n':>9} {'h':>9} {'seconds':>9} {'tests':>11} {'peak MB':>8}")
+    for dist in args.distributions:
+        for name in args.algorithms:
+            for n in sorted(args.sizes):
+                rng = np.random.default_rng(args.seed)
+                pts = DISTRIBUTIONS[dist](n, rng)
+                cell = run_cell(ALGORITHMS[name], pts, args.repeat, not args.no_memory)
+                cell.update(algorithm=name, distribution=dist, n=n)
+                results.append(cell)
+                mb = f"{cell['peak_bytes'] / 2**20:>8.1f}" if "peak_bytes" in cell else f"{'-':>8}"
+                print(f"{name:>16} {dist:>15} {n:>9} {cell['h']:>9} {cell['seconds']:>9.4f} "
+                      f"{cell['orient_tests']:>11} {mb}")
+                sys.stdout.flush()
+                if cell["seconds"] > args.max_seconds:
+                    break
+
+    out = {"meta": metadata(), "results": results}
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(out, f, indent=1)
+    if args.compare:
+        with open(args.compare) as f:
+            compare(results, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+import json
+import math
+import os
+import numpy as np
+
+from hull import akl_toussaint, chan, graham_scan, hull_indices, quickhull
+
+
+# auto(pts) picks the hull engine for an input. Which one is fastest depends
+# on n, on how many points the Akl-Toussaint pre-filter removes and on the
+# hull size h, and only n is known up front. A small random sample estimates
+# the other two, and a cost model predicts each engine's time as a sum of
+# terms times per-machine coefficients (see _terms()):
+#
+#   graham_fast       graham_fast + graham_fast_n * n + graham_fast_sort * n log n
+#   chan, quickhull   <e> + <e>_n * n + <e>_work * n log h + <e>_h * h
+#   ..._pf8           filter * n + the same engine's cost on the kept points
+#
+# The h terms are for the Python steps per hull vertex, chan's wrapping and
+# quickhull's splits. A pre-filtered engine is modelled as its plain engine
+# run on the kept points, so the two share their coefficients and are fitted
+# together. The coefficients come from a profile fitted to a recorded run of
+# benchmarks/suite.py, so the crossover points follow the machine the suite
+# ran on. DEFAULT_PROFILE is fitted to the run kept in benchmarks/profile.json;
+# load_profile() fits one to any other suite output, and
+#   $ python -m benchmarks.dispatch_check
+# checks that choose() picks the fastest engine, or close, on its inputs.
+
+SAMPLE_SIZE = 1024
+
+ENGINES = {
+    "graham_fast": lambda pts, stats, h: graham_scan(pts, fast=True, stats=stats),
+    "graham_fast_pf8": lambda pts, stats, h: graham_scan(pts, fast=True, prefilter=8, stats=stats),
+    "chan": lambda pts, stats, h: chan(pts, stats=stats, h_hint=h),
+    "chan_pf8": lambda pts, stats, h: chan(pts, prefilter=8, stats=stats, h_hint=h),
+    "quickhull": lambda pts, stats, h: quickhull(pts, stats=stats),
+}
+
+# engines for coordinates too wide for float64, which run on Python ints:
+# there the pre-filter pays off for any input
+WIDE_ENGINES = ["graham_fast_pf8", "chan_pf8"]
+
+# The suite run DEFAULT_PROFILE is fitted to; its "meta" has the commit and
+# machine it ran on. Record it again after changing an engine with
+#   $ python -m benchmarks.suite --algorithms graham_fast graham_fast_pf8 chan chan_pf8 quickhull \
+#         --sizes 1000 10000 100000 1000000 --no-memory --output benchmarks/profile.json
+PROFILE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmarks", "profile.json")
+
+
+def _terms(engine, n, kept, h):
+    # the cost model's terms, {coefficient name: value}, for n points, kept
+    # of them surviving the pre-filter, and h hull vertices
+    terms = {}
+    if engine.endswith("_pf8"):
+        engine = engine[:-len("_pf8")]
+        terms["filter"] = n
+        n = kept
+    terms[engine] = 1.0
+    terms[engine + "_n"] = n
+    if engine == "graham_fast":
+        terms["graham_fast_sort"] = n * math.log2(max(n, 2))
+    else:
+        terms[engine + "_work"] = n * math.log2(h + 2)
+        terms[engine + "_h"] = h
+    return terms
+
+
+def _nnls(A, b):
+    # least squares with non-negative coefficients: the most negative one is
+    # dropped (set to 0) and the rest refitted until none is negative
+    active = list(range(A.shape[1]))
+    while True:
+        x = np.zeros(A.shape[1])
+        x[active] = np.linalg.lstsq(A[:, active], b, rcond=None)[0]
+        if x.min() >= 0:
+            return x
+        active.remove(int(np.argmin(x)))
+
+
+def fit_profile(results, min_n=10_000):
+    # A profile, {"engines": [...], "coef": {name: seconds}}, from the
+    # "results" of a benchmarks/suite.py run, using the cells of at least
+    # min_n points, where the choice matters. The engines' cells are fitted
+    # together by least squares weighted by 1/sqrt(seconds), in between
+    # absolute error (only the largest inputs count) and relative error
+    # (small inputs count as much). Only engines with 4 cells or more are fitted.
+    engines = [e for e in ENGINES
+               if sum(r["algorithm"] == e and r["n"] >= min_n for r in results) >= 4]
+    cells = [r for r in results if r["algorithm"] in engines and r["n"] >= min_n]
+    terms = [_terms(r["algorithm"], r["n"], r["n"] - r["culled"], r["h"]) for r in cells]
+    names = sorted({k for T in terms for k in T})
+    A = np.array([[T.get(k, 0.0) for k in names] for T in terms])
+    t = np.array([r["seconds"] for r in cells])
+    w = 1 / np.sqrt(t)
+    coef = _nnls(A * w[:, None], t * w) if cells else []
+    return {"engines": engines, "coef": dict(zip(names, map(float, coef)))}
+
+
+def predict(profile, engine, n, kept, h):
+    # predicted seconds of engine under profile
+    coef = profile["coef"]
+    return sum(coef[k] * v for k, v in _terms(engine, n, kept, h).items())
+
+
+def load_profile(path):
+    # a profile saved as JSON, or fitted from benchmarks/suite.py output
+    with open(path) as f:
+        data = json.load(f)
+    return fit_profile(data["results"]) if "results" in data else data
+
+
+DEFAULT_PROFILE = load_profile(PROFILE_PATH)
+
+
+def _wide(pts):
+    # True if the coordinates only fit in Python ints (see hull.exact_coords)
+    if pts.dtype == object:
+        return True
+    if not np.issubdtype(pts.dtype, np.integer):
+        return False
+    return int(pts.max()) - int(pts.min()) >= 2**53
+
+
+def estimate(pts, sample=SAMPLE_SIZE, seed=0):
+    # (kept, h): rough counts of the points surviving the 8-direction
+    # pre-filter and of the hull vertices, from a random sample. kept is an
+    # overestimate, as a sample's extreme points cull less than all points
+    # do. h is extrapolated as h ~ n^alpha, with alpha the log-log slope of
+    # the hull sizes of the sample's first 1/8, 1/4, 1/2 and all of it:
+    # about 0 for polygons and grids, 1/3 for disks. Small hulls make the
+    # slope noisy, so it is capped at the disk's 1/3, unless most sample
+    # points are on its hull (h close to n).
+    n = len(pts)
+    S = pts[np.random.default_rng(seed).integers(0, n, sample)]
+    kept = len(akl_toussaint(S, 8)) / sample * n
+    hs = len(hull_indices(S))
+    if hs > sample // 2:
+        return int(kept), min(n, int(hs / sample * n))
+    sizes = [sample // 8, sample // 4, sample // 2, sample]
+    hulls = [max(len(hull_indices(S[:k])), 1) for k in sizes]
+    alpha = min(1 / 3, max(0.0, np.polyfit(np.log(sizes), np.log(hulls), 1)[0]))
+    return int(kept), min(n, int(hs * (n / sample) ** alpha))
+
+
+def choose(pts, profile=None, sample=SAMPLE_SIZE):
+    # (engine, h_hint, reason) for the input pts
+    profile = profile or DEFAULT_PROFILE
+    n = len(pts)
+    kept, h = estimate(pts, sample)
+    wide = _wide(pts)
+    engines = [e for e in (WIDE_ENGINES if wide else ENGINES) if e in profile["engines"]]
+    if not engines:
+        raise ValueError("the profile has none of the engines " + ", ".join(ENGINES))
+    cost = {e: predict(profile, e, n, kept, h) for e in engines}
+    best = min(cost, key=cost.get)
+    reason = (f"n={n} est. h~{h} pre-filter keeps~{kept}: "
+              + ", ".join(f"{e} {cost[e] * 1000:.1f}ms" for e in sorted(cost, key=cost.get)))
+    if wide:
+        reason += " (coordinates wider than 2^53, pre-filtered engines only)"
+    return best, h, reason
+
+
+def auto(pts, stats=None, profile=None, sample=SAMPLE_SIZE):
+    # input: np array of shape (n, 2) where n is the # of pts
+    # output: ccw convex hull vertices, like graham_scan()
+    # The engine is chosen by choose(); stats.engine and stats.reason report
+    # the choice along with the usual HullStats of the run. Inputs that fit
+    # in the sample are simply run through graham_scan(fast=True).
+    n = len(pts)
+    if n <= sample:
+        engine, h, reason = "graham_fast", None, f"n={n} fits in the sample, no estimate needed"
+    else:
+        engine, h, reason = choose(pts, profile, sample)
+    if stats is not None:
+        stats.engine, stats.reason = engine, reason
+    return ENGINES[engine](pts, stats, h)
@@ -0,0 +1,887 @@
+import math
+import time
+from fractions import Fraction
+from functools import cmp_to_key
+import numpy as np
+from contextlib import nullcontext
+
+from predicates import ORIENT_ERRBOUND, orient_sign, orient_filtered
+from stats import HullStats
+from steps import GrahamTrace, ChanTrace, QuickTrace
+
+
+# Headless convex hull engine. Only depends on NumPy so it can be imported in
+# batch workers without pulling in tkinter; the GUI in app.py calls into it.
+# Points are np arrays of shape (n, 2) in canvas coordinates (y grows down),
+# and hulls are returned counterclockwise as seen on the canvas.
+
+
+# chan(wrap="auto") switches to batched wrapping steps at this many sub-hulls
+BATCH_WRAP_MIN_HULLS = 16
+
+# quickhull() hands edges with at most this many points outside to
+# hull_indices() rather than splitting them further one by one
+QUICKHULL_LEAF = 64
+
+# chan(workers=k) only uses a process pool from this many points on, below it
+# starting the workers costs more than they save
+PARALLEL_MIN_POINTS = 200_000
+
+
+def _phase(stats, name):
+    # stats.phase(name), or a no-op when no stats are collected
+    return nullcontext() if stats is None else stats.phase(name)
+
+
+def partition(pts, m):
+    # groups of m consecutive points, the last one possibly smaller; the
+    # groups are views of pts, nothing is copied or moved
+    return [pts[i:i+m] for i in range(0, len(pts), m)]
+
+
+def angle(a, b, c):
+    if np.all(b==c) or np.all(a==c):
+        return -np.inf # Do not consider degenerate angles
+    v1 = b - a; v2 = c - b
+    ang = np.arctan2(np.cross(v1, v2), np.dot(v1, v2))
+    ang = ang + 2*np.pi if ang < 0 else ang
+    return ang
+
+
+def orient(p1, p2, p3):
+    return (p2[1] - p1[1]) * (p3[0] - p1[0]) - (p2[0] - p1[0]) * (p3[1] - p1[1])
+
+
+# Array versions of angle() and orient(). P is a whole ragged set of sub-hulls
+# concatenated into one (k, 2) array, with offsets[j]:offsets[j+1] being Hj.
+
+def orient_batch(p1, p2, P):
+    # orient(p1, p2, pt) for every row pt of P
+    return orient(p1, p2, P.T)
+
+
+def angle_batch(a, b, P):
+    # angle(a, b, pt) for every row pt of P, -inf where it is degenerate
+    v1 = b - a; v2 = P - b
+    ang = np.arctan2(v1[0] * v2[:, 1] - v1[1] * v2[:, 0], v2 @ v1)
+    ang = np.where(ang < 0, ang + 2*np.pi, ang)
+    ang[np.all(P == b, axis=1) | np.all(P == a, axis=1)] = -np.inf
+    return ang
+
+
+def segmented_argmax(values, offsets):
+    # index into values of the first maximum of every (non-empty) segment
+    starts = offsets[:-1]
+    seg_max = np.maximum.reduceat(values, starts)
+    hit = values == np.repeat(seg_max, np.diff(offsets))
+    pos = np.where(hit, np.arange(len(values)), len(values))
+    return np.minimum.reduceat(pos, starts)
+
+
+def exact_coords(pts):
+    # Coordinates in a dtype where orient() signs can be had exactly. Integer
+    # input (and float input holding only integers) is shifted to its minimum
+    # and kept in int64 while products cannot overflow. Wider integers become
+    # float64 while they are exactly representable, for the filtered
+    # predicates in predicates.py, and Python ints beyond that. Other float
+    # input is used as float64, also through the filtered predicates.
+    if len(pts) == 0:
+        return pts.astype(np.int64 if np.issubdtype(pts.dtype, np.integer) else np.float64)
+    if not np.issubdtype(pts.dtype, np.integer):
+        P = pts.astype(np.float64, copy=False)
+        lo, hi = P.min(), P.max()
+        if hi - lo < 2**31 and np.all(P == np.trunc(P)):
+            return (P - lo).astype(np.int64)
+        return P
+    lo, hi = int(pts.min()), int(pts.max())
+    if hi - lo < 2**31:
+        return pts.astype(np.int64) - np.int64(lo)
+    if hi - lo < 2**53:
+        return (pts - lo).astype(np.float64)
+    return pts.astype(object) - lo
+
+
+def _turns(xs, ys, stats=None):
+    # orient() of every three consecutive points, with exact signs
+    return orient_filtered(xs[:-2], ys[:-2], xs[1:-1], ys[1:-1], xs[2:], ys[2:], stats)
+
+
+def _convex_chain(xs, ys, idx, stats=None):
+    # Keep the points of idx (sorted along x, coordinates xs/ys) that turn ccw,
+    # i.e. one half of the hull. Each pass drops every point that does not turn
+    # ccw with its current neighbours, all at once; such a point can never be a
+    # hull vertex. Passes are cheap next to the interpreter, so only after
+    # many of them do the survivors go through the usual stack scan.
+    for _ in range(64):
+        if len(idx) <= 2:
+            return idx
+        o = _turns(xs, ys, stats)
+        if stats is not None: stats.orient_tests += len(o)
+        keep = np.ones(len(idx), dtype=bool)
+        keep[1:-1] = o > 0
+        dropped = len(idx) - np.count_nonzero(keep)
+        if dropped == 0:
+            return idx
+        xs, ys, idx = xs[keep], ys[keep], idx[keep]
+    if len(idx) <= 2:
+        return idx
+
+    xs = xs.tolist(); ys = ys.tolist()
+    stack = [0, 1]
+    tests = 0
+    for i in range(2, len(idx)):
+        while len(stack) >= 2:
+            a, b = stack[-2], stack[-1]
+            tests += 1
+            if orient_sign((xs[a], ys[a]), (xs[b], ys[b]), (xs[i], ys[i])) > 0:
+                break
+            stack.pop()
+        stack.append(i)
+    if stats is not None: stats.orient_tests += tests
+    return idx[stack]
+
+
+def _xy_order(P):
+    # indices sorting P (from exact_coords) by x, then y
+    if P.dtype == np.int64:
+        return np.argsort((P[:, 0] << 31) | P[:, 1])
+    order = np.argsort(P[:, 0])
+    xs = P[order, 0]
+    if np.any(xs[1:] == xs[:-1]):
+        order = np.lexsort((P[:, 1], P[:, 0]))
+    return order
+
+
+def lex_sort(P):
+    # Indices sorting P (from exact_coords) by x, then y, without duplicates,
+    # along with the sorted points themselves
+    order = _xy_order(P)
+    S = P[order]
+    distinct = np.r_[True, (S[1:, 0] != S[:-1, 0]) | (S[1:, 1] != S[:-1, 1])]
+    return order[distinct], S[distinct]
+
+
+def hull_indices(pts, stats=None):
+    # input: np array of shape (n, 2) where n is the # of pts
+    # output: indices of the ccw convex hull vertices, starting from the lowest
+    #         point on the canvas (largest y, then smallest x), like graham_scan
+    # stats: optional HullStats; the chains count as pushed points, and the
+    #        ones the scan drops again as pops
+    if len(pts) == 0:
+        return np.empty(0, dtype=np.int64)
+    with _phase(stats, "sort"):
+        order, P = lex_sort(exact_coords(pts))
+    with _phase(stats, "scan"):
+        if len(order) < 3:
+            ring = order
+        else:
+            # The line through the leftmost and rightmost points splits the chains
+            xs, ys = P[:, 0], P[:, 1]
+            side = orient_filtered(P[0, 0], P[0, 1], P[-1, 0], P[-1, 1], xs, ys, stats)
+            lower = side < 0; lower[0] = lower[-1] = True
+            upper = side > 0; upper[0] = upper[-1] = True
+            if stats is not None:
+                stats.orient_tests += len(side)
+                pushed = np.count_nonzero(lower) + np.count_nonzero(upper)
+            lower = _convex_chain(xs[lower], ys[lower], order[lower], stats)
+            upper = _convex_chain(xs[upper][::-1], ys[upper][::-1], order[upper][::-1], stats)
+            if stats is not None:
+                stats.pushes += pushed
+                stats.pops += pushed - len(lower) - len(upper)
+            ring = np.concatenate([lower[:-1], upper[:-1]])
+
+        ys = pts[ring, 1]
+        lowest = np.flatnonzero(ys == ys.max())
+        start = lowest[np.argmin(pts[ring[lowest], 0])]
+        return np.roll(ring, -start)
+
+
+def _convex_chains(xs, ys, idx, seg, stats=None):
+    # _convex_chain() for many chains at once: seg labels the chain of every
+    # point and each chain is contiguous. A pass drops the points that do not
+    # turn ccw with neighbours of the same chain, in all the chains together.
+    # Returns the surviving idx and seg.
+    for _ in range(64):
+        if len(idx) <= 2:
+            return idx, seg
+        o = _turns(xs, ys, stats)
+        if stats is not None: stats.orient_tests += len(o)
+        keep = np.ones(len(idx), dtype=bool)
+        keep[1:-1] = (o > 0) | (seg[:-2] != seg[2:])
+        if keep.all():
+            return idx, seg
+        xs, ys, idx, seg = xs[keep], ys[keep], idx[keep], seg[keep]
+
+    xs = xs.tolist(); ys = ys.tolist(); labels = seg.tolist()
+    stack = []
+    tests = 0
+    for i in range(len(idx)):
+        while len(stack) >= 2 and labels[stack[-2]] == labels[i]:
+            a, b = stack[-2], stack[-1]
+            tests += 1
+            if orient_sign((xs[a], ys[a]), (xs[b], ys[b]), (xs[i], ys[i])) > 0:
+                break
+            stack.pop()
+        stack.append(i)
+    if stats is not None: stats.orient_tests += tests
+    return idx[stack], seg[stack]
+
+
+def hull_indices_batch(pts, offsets, stats=None):
+    # input: np array of shape (n, 2) holding many point groups back to back,
+    #        group g being pts[offsets[g]:offsets[g+1]]
+    # output: (idx, hull_offsets) in the same ragged layout: the hull of group
+    #         g is pts[idx[hull_offsets[g]:hull_offsets[g+1]]], ccw from its
+    #         lowest point, exactly as hull_indices(group) would give it
+    # All groups are sorted and scanned together with segmented NumPy passes,
+    # so millions of small groups cost a few array operations, not a Python
+    # call each.
+    offsets = np.asarray(offsets, dtype=np.int64)
+    if len(offsets) == 0 or offsets[0] != 0 or offsets[-1] != len(pts) or np.any(np.diff(offsets) < 0):
+        raise ValueError("offsets must rise from 0 to len(pts)")
+    G = len(offsets) - 1
+    if len(pts) == 0:
+        return np.empty(0, dtype=np.int64), np.zeros(G + 1, dtype=np.int64)
+    P = exact_coords(pts)
+    if P.dtype == object:
+        # coordinates too wide even for exact floats, go group by group
+        H = [offsets[g] + hull_indices(pts[offsets[g]:offsets[g+1]], stats)
+             for g in range(G) if offsets[g+1] > offsets[g]]
+        counts = np.zeros(G, dtype=np.int64)
+        counts[np.diff(offsets) > 0] = [len(Hg) for Hg in H]
+        return np.concatenate(H).astype(np.int64), np.r_[0, np.cumsum(counts)]
+
+    with _phase(stats, "sort"):
+        rank = _ranks(P, np.arange(len(P)))
+    group = np.repeat(np.arange(G), np.diff(offsets))
+    return _hull_rings(P, np.arange(len(P)), group, rank, G, stats)
+
+
+def _ranks(P, idx):
+    # position of every point P[idx] in the x, y order of P[idx], stored at
+    # rank[idx]; the other entries of rank are left unset
+    rank = np.empty(len(P), dtype=np.int64)
+    rank[idx[_xy_order(P[idx])]] = np.arange(len(idx))
+    return rank
+
+
+def _hull_rings(P, cand, group, rank, G, stats=None, merge=False):
+    # The segmented scan behind hull_indices_batch(): the hulls of the groups
+    # 0..G-1 of the points P[cand], where group[i] is the group of cand[i].
+    # Sorting by group and rank is two argsorts' worth of work, much faster
+    # than a three-key lexsort. merge=True is for candidates that already come
+    # in a few sorted runs per group, e.g. the vertices of smaller hulls: a
+    # stable sort (timsort) then just merges those runs.
+    with _phase(stats, "sort"):
+        by_rank = np.argsort(group * len(P) + rank[cand], kind="stable" if merge else None)
+        order, group = cand[by_rank], group[by_rank]
+        S = P[order]
+        distinct = np.r_[True, (S[1:, 0] != S[:-1, 0]) | (S[1:, 1] != S[:-1, 1]) | (group[1:] != group[:-1])]
+        order, S, group = order[distinct], S[distinct], group[distinct]
+
+    with _phase(stats, "scan"):
+        # every group splits at the line through its leftmost and rightmost points
+        first = np.r_[True, group[1:] != group[:-1]]
+        last = np.r_[group[1:] != group[:-1], True]
+        starts = np.flatnonzero(first)
+        ends = np.flatnonzero(last)
+        a = np.repeat(S[starts], np.diff(np.r_[starts, len(S)]), axis=0)
+        b = np.repeat(S[ends], np.diff(np.r_[starts, len(S)]), axis=0)
+        side = orient_filtered(a[:, 0], a[:, 1], b[:, 0], b[:, 1], S[:, 0], S[:, 1], stats)
+        lower = (side < 0) | first | last
+        upper = ((side > 0) | first | last)[::-1]
+        xs, ys = S[:, 0], S[:, 1]
+        rx, ry, rorder, rgroup = xs[::-1], ys[::-1], order[::-1], group[::-1]
+        lo, lo_g = _convex_chains(xs[lower], ys[lower], order[lower], group[lower], stats)
+        up, up_g = _convex_chains(rx[upper], ry[upper], rorder[upper], rgroup[upper], stats)
+        if stats is not None:
+            pushed = np.count_nonzero(lower) + np.count_nonzero(upper)
+            stats.orient_tests += len(side)
+            stats.pushes += pushed
+            stats.pops += pushed - len(lo) - len(up)
+
+        # ring = lower chain and upper chain, each without its last point; a
+        # group of one distinct point keeps it from its lower chain
+        lo_last = np.r_[lo_g[1:] != lo_g[:-1], True] & np.r_[False, lo_g[1:] == lo_g[:-1]]
+        up_last = np.r_[up_g[1:] != up_g[:-1], True]
+        ring = np.concatenate([lo[~lo_last], up[~up_last]])
+        ring_g = np.concatenate([lo_g[~lo_last], up_g[~up_last]])
+        by_group = np.argsort(ring_g, kind="stable")
+        ring, ring_g = ring[by_group], ring_g[by_group]
+
+        # rotate every ring to start from its lowest point on the canvas
+        counts = np.bincount(ring_g, minlength=G)
+        hull_offsets = np.r_[0, np.cumsum(counts)]
+        if len(ring) == 0:
+            return ring, hull_offsets
+        R = P[ring]
+        lowest = np.lexsort((R[:, 0], -R[:, 1], ring_g))
+        start = lowest[np.minimum(hull_offsets[:-1], len(ring) - 1)]
+        pos = np.arange(len(ring)) - start[ring_g]
+        pos %= counts[ring_g]
+        out = np.empty_like(ring)
+        out[hull_offsets[ring_g] + pos] = ring
+    return out, hull_offsets
+
+
+def akl_toussaint(pts, directions=8, stats=None):
+    # input: np array of shape (n, 2), directions 4 or 8
+    # output: indices of the points that are not strictly inside the polygon
+    #         spanned by the extreme points in the given directions; the points
+    #         inside can never be hull vertices
+    if directions not in (4, 8):
+        raise ValueError("directions must be 4 or 8")
+    if len(pts) == 0:
+        return np.empty(0, dtype=np.int64)
+    P = exact_coords(pts)
+    x, y = P[:, 0], P[:, 1]
+    keys = [x, x + y, y, y - x, -x, -x - y, -y, x - y] # ccw around the x axis
+    if directions == 4:
+        keys = keys[::2]
+    poly = []
+    for key in keys:
+        i = int(np.argmax(key))
+        if not poly or (i != poly[-1] and i != poly[0]):
+            poly.append(i)
+    if len(poly) < 3:
+        return np.arange(len(pts))
+
+    inside = np.ones(len(pts), dtype=bool)
+    if stats is not None: stats.orient_tests += len(poly) * len(pts)
+    floats = P.dtype == np.float64
+    for a, b in zip(poly, poly[1:] + poly[:1]):
+        # the polygon runs clockwise in orient() terms: inside is o < 0
+        t1 = (P[b, 1] - P[a, 1]) * (x - P[a, 0])
+        t2 = (P[b, 0] - P[a, 0]) * (y - P[a, 1])
+        if floats:
+            # only trust the sign beyond the rounding error of the products
+            inside &= t1 - t2 < -4 * np.finfo(np.float64).eps * (np.abs(t1) + np.abs(t2))
+        else:
+            inside &= t1 - t2 < 0
+    return np.flatnonzero(~inside)
+
+
+def _prefilter(pts, directions, stats):
+    if stats is not None:
+        stats.n = len(pts)
+    if not directions:
+        return pts
+    with _phase(stats, "prefilter"):
+        keep = akl_toussaint(pts, directions, stats)
+    if stats is not None:
+        stats.culled = len(pts) - len(keep)
+    return pts[keep]
+
+
+def _radial_order(P, Q, b):
+    # Indices sorting P (from exact_coords) by decreasing angle around their
+    # lowest point P[b].
+    # The float angles settle nearly all of the order; runs of angles too
+    # close to tell apart are sorted again with exact orientation tests on Q
+    # (the points as exact_coords() lists). Points in the same direction go
+    # by distance, walking the bottom row from the left towards b.
+    d = (P - P[b]).astype(np.float64)
+    angles = np.arctan2(d[:, 1], d[:, 0])
+    order = np.argsort(angles)[::-1].copy()
+    a = angles[order]
+    close = np.r_[0, (a[:-1] - a[1:] <= 1e-12).astype(np.int8), 0]
+    edges = np.flatnonzero(np.diff(close))
+    if len(edges) == 0:
+        return order
+    qb = Q[b]
+
+    def compare(i, j):
+        o = orient_sign(qb, Q[i], Q[j])
+        if o != 0:
+            return -o
+        di = abs(Q[i][0] - qb[0]) + abs(Q[i][1] - qb[1])
+        dj = abs(Q[j][0] - qb[0]) + abs(Q[j][1] - qb[1])
+        if Q[i][1] == qb[1] and Q[i][0] < qb[0]:
+            di, dj = dj, di # left of b the farthest comes first
+        return (di > dj) - (di < dj)
+
+    for first, last in zip(edges[::2], edges[1::2]):
+        order[first:last+1] = sorted(order[first:last+1].tolist(), key=cmp_to_key(compare))
+    return order
+
+
+def graham_scan(pts, demo=False, fast=False, prefilter=0, stats=None, on_step=None):
+    # input: np array of shape (n, 2) where n is the # of pts
+    # output: ccw convex hull vertices
+    # fast=True skips the demo machinery and runs the vectorized monotone
+    # chain in hull_indices(), which gives the same hull for large inputs.
+    # prefilter=4 or 8 first drops the points inside the Akl-Toussaint polygon
+    # with that many directions; a HullStats passed as stats reports how many,
+    # along with the time per phase and the predicate and stack counts.
+    # on_step(trace) is called after every recorded demo step (see steps.py).
+    pts = _prefilter(pts, prefilter, stats)
+    if fast:
+        if demo:
+            raise ValueError("fast mode does not record demo steps")
+        return pts[hull_indices(pts, stats)]
+    if len(pts) == 0 and not demo:
+        return pts[:0]
+    if 0 < len(pts) and np.all(pts == pts[0]):
+        # one distinct point: nothing to sort or scan
+        if not demo:
+            return pts[:1]
+        steps = GrahamTrace(pts, on_step)
+        steps.start(0)
+        steps.init(0)
+        steps.final()
+        return steps
+
+    # Get a boundary pt
+    b = np.argmax(pts[:, 1])
+    boundary_pt = pts[b]
+
+    # Sort radially w/ respect to boundary pt
+    with _phase(stats, "sort"):
+        P = exact_coords(pts)
+        Q = P.tolist() # for exact orientation tests
+        order = _radial_order(P, Q, b)
+        pts = pts[order]
+        Q = [Q[i] for i in order]
+    if stats is not None:
+        stats.angle_calls += len(pts)
+        scan_start = time.perf_counter()
+    if demo:
+        steps = GrahamTrace(pts, on_step)
+        steps.start(int(np.flatnonzero(np.all(pts == boundary_pt, axis=1))[0]))
+
+    # Initialize stack
+    stack = [0, 1]
+    if demo: steps.init(0, 1)
+
+    tests = 0; pops = 0
+    for i in range(2, len(pts)):
+        if demo: steps.test(i)
+
+        while len(stack) >= 2 and orient_sign(Q[stack[-2]], Q[stack[-1]], Q[i]) <= 0:
+            tests += 1; pops += 1
+            stack.pop()
+            if demo: steps.pop()
+        tests += len(stack) >= 2
+
+        stack.append(i)
+        if demo: steps.push(i)
+
+    # points collinear with the closing edge back to the start go too
+    closing = len(stack) >= 3 and orient_sign(Q[stack[-2]], Q[stack[-1]], Q[stack[0]]) <= 0
+    if closing and demo: steps.test(stack[0])
+    while closing:
+        tests += 1; pops += 1
+        stack.pop()
+        if demo: steps.pop()
+        closing = len(stack) >= 3 and orient_sign(Q[stack[-2]], Q[stack[-1]], Q[stack[0]]) <= 0
+
+    if demo: steps.final()
+    if stats is not None:
+        stats.orient_tests += tests
+        stats.pushes += max(len(pts), 2)
+        stats.pops += pops
+        stats.add_time("scan", time.perf_counter() - scan_start)
+
+    return steps if demo else pts[stack]
+
+
+def turns_right(p, a, b):
+    # True if b should replace a as the next hull point after p: b lies to the
+    # right of p->a, or on it but farther away. Points equal to p never win.
+    if b[0] == p[0] and b[1] == p[1]:
+        return False
+    if a[0] == p[0] and a[1] == p[1]:
+        return True
+    o = orient_sign(p, a, b)
+    if o != 0:
+        return o < 0
+    return abs(b[0] - p[0]) + abs(b[1] - p[1]) > abs(a[0] - p[0]) + abs(a[1] - p[1])
+
+
+def _is_tangent(p, V, c):
+    n = len(V)
+    if V[c][0] == p[0] and V[c][1] == p[1]:
+        return False
+    return orient_sign(p, V[c], V[c-1]) >= 0 and orient_sign(p, V[(c+1) % n], V[c]) <= 0
+
+
+def tangent(p, V, stats=None):
+    # input: point p on or outside the ccw convex polygon V (list of points)
+    # output: index of the vertex q of V with no vertex to the right of p->q
+    # Binary search over the polygon (D. Sunday's tangent search, O(log n)).
+    # Degenerate cases that the search cannot settle, e.g. p being a vertex of
+    # V or lying on one of its edges, fall back to a linear scan.
+    n = len(V)
+    tests = 0
+    if n >= 3:
+        def above(i, j):
+            nonlocal tests; tests += 1
+            return orient_sign(p, V[i % n], V[j % n]) > 0
+
+        def below(i, j):
+            nonlocal tests; tests += 1
+            return orient_sign(p, V[i % n], V[j % n]) < 0
+
+        if below(1, 0) and not above(n-1, 0) and _is_tangent(p, V, 0):
+            if stats is not None: stats.orient_tests += tests + 2
+            return 0
+        a, b = 0, n
+        for _ in range(2 * n.bit_length() + 2):
+            c = (a + b) // 2
+            down_c = below(c+1, c)
+            if down_c and not above(c-1, c):
+                tests += 2
+                if _is_tangent(p, V, c % n):
+                    if stats is not None: stats.orient_tests += tests
+                    return c % n
+                break
+            if above(a+1, a):
+                if down_c or above(a, c):
+                    b = c
+                else:
+                    a = c
+            else:
+                if down_c and below(a, c):
+                    b = c
+                else:
+                    a = c
+            if b - a < 1:
+                break
+
+    best = 0
+    for i in range(1, n):
+        if turns_right(p, V[best], V[i]):
+            best = i
+    if stats is not None: stats.orient_tests += tests + max(n - 1, 0)
+    return best
+
+
+def _tangent_candidates(V, offsets, cur, stats=None):
+    # qj for every sub-hull by binary tangent search; p(i-1) = vertex cur is a
+    # vertex of its own sub-hull, so that one just advances
+    j1 = int(np.searchsorted(offsets, cur, side='right')) - 1
+    k1 = cur - offsets[j1]
+    p = V[j1][k1]
+    return np.array([offsets[j] + ((k1 + 1) % len(Vj) if j == j1 else tangent(p, Vj, stats))
+                     for j, Vj in enumerate(V)])
+
+
+def _batch_candidates(p0, p1, Hall, offsets, stats=None):
+    # qj for every sub-hull with one angle_batch() over all of them, and the
+    # chosen pi. Angles are floats, so pi is confirmed with exact orientation
+    # tests (nothing may lie to its right, collinear points go to the farthest);
+    # None means the angles were not good enough to decide.
+    ang = angle_batch(p0, p1, Hall)
+    cand = segmented_argmax(ang, offsets)
+    best = cand[np.argmax(ang[cand])]
+    o = orient_filtered(p1[0], p1[1], Hall[best, 0], Hall[best, 1], Hall[:, 0], Hall[:, 1], stats)
+    if stats is not None:
+        stats.angle_calls += len(ang)
+        stats.orient_tests += len(o)
+    if np.any(o < 0):
+        return cand, None
+    d = Hall - p1
+    ahead = (o == 0) & (d @ (Hall[best] - p1) > 0)
+    if not np.any(ahead):
+        return cand, None
+    far = np.flatnonzero(ahead)
+    return cand, far[np.argmax(np.abs(d[far]).sum(axis=1))]
+
+
+def _subhull_job(name, shape, dtype, offsets, collect):
+    # hull_indices_batch() of the groups pts[offsets[j]:offsets[j+1]] of the
+    # points in shared memory. Only the hull vertex indices go back to the
+    # parent, along with the worker's HullStats if the parent collects them.
+    from multiprocessing import shared_memory
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        pts = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+        stats = HullStats() if collect else None
+        a, b = offsets[0], offsets[-1]
+        idx, hull_offsets = hull_indices_batch(pts[a:b], offsets - a, stats)
+        del pts
+        return idx + a, np.diff(hull_offsets), stats
+    finally:
+        shm.close()
+
+
+def _parallel_subhulls(pts, m, stats, pool, name, workers):
+    # Same groups as partition(), every worker takes a range of whole groups
+    n = len(pts)
+    r = math.ceil(n / m)
+    bounds = np.linspace(0, r, min(r, 4 * workers) + 1).astype(int)
+    jobs = [pool.submit(_subhull_job, name, pts.shape, pts.dtype,
+                        np.minimum(np.arange(a, b + 1) * m, n), stats is not None)
+            for a, b in zip(bounds[:-1], bounds[1:]) if a < b]
+    rings, counts = [], []
+    for job in jobs:
+        idx, sizes, worker_stats = job.result()
+        rings.append(idx); counts.append(sizes)
+        if stats is not None: stats.merge(worker_stats)
+    return np.concatenate(rings), np.r_[0, np.cumsum(np.concatenate(counts))]
+
+
+def _merge_subhulls(pts, P, ring, m, rank, stats):
+    # Sub-hulls for groups of m points from the ccw sub-hulls ring of the last
+    # round: each new group is a run of whole old groups, so its hull is the
+    # hull of their vertices. Every old ring is a few runs in x, y order and
+    # the stable sort only has to merge them.
+    n = len(pts)
+    r = math.ceil(n / m)
+    group = ring // m
+    if P.dtype == object:
+        bounds = np.r_[0, np.cumsum(np.bincount(group, minlength=r))]
+        H = [ring[a:b][hull_indices(pts[ring[a:b]], stats)] for a, b in zip(bounds[:-1], bounds[1:])]
+        return np.concatenate(H), np.r_[0, np.cumsum([len(Hj) for Hj in H])]
+    return _hull_rings(P, ring, group, rank, r, stats, merge=True)
+
+
+def chan(pts, demo=False, wrap="auto", prefilter=0, stats=None, workers=None, on_step=None, h_hint=None):
+    # input: np array of shape (n, 2) where n is the # of pts
+    # output: ccw convex hull vertices
+    # wrap picks how each wrapping step finds the qj's:
+    #   "tangent": binary tangent search in every Hj, O(r log m) per step
+    #   "batch":   angle_batch() over all Hj at once and a segmented argmax,
+    #              O(n) per step but only a few NumPy calls
+    #   "auto":    "batch" while there are many small sub-hulls, else "tangent"
+    # workers > 1 builds the first round's sub-hulls in a process pool; the
+    # points are shared with it through shared memory rather than pickled.
+    # Inputs below PARALLEL_MIN_POINTS (and demo runs) stay serial.
+    # h_hint, a known or estimated hull size, starts with m = h_hint instead
+    # of going through the rounds for smaller m first.
+    # prefilter and stats work as in graham_scan(); stats also get the rounds
+    # and the (m, r) of each, and the time spent in "subhulls" and "wrap".
+    # on_step works as in graham_scan().
+    pts = _prefilter(pts, prefilter, stats)
+    if len(pts) == 0 and not demo:
+        return pts[:0]
+    if demo or not workers or workers < 2 or len(pts) < PARALLEL_MIN_POINTS or pts.dtype == object:
+        return _chan(pts, demo, wrap, stats, on_step=on_step, h_hint=h_hint)
+
+    # imported here: the process pool machinery costs ~20 ms to import, and
+    # serial runs never need it
+    from concurrent.futures import ProcessPoolExecutor
+    from multiprocessing import shared_memory
+    shm = shared_memory.SharedMemory(create=True, size=pts.nbytes)
+    try:
+        shared = np.ndarray(pts.shape, dtype=pts.dtype, buffer=shm.buf)
+        shared[:] = pts
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            hull = _chan(shared, demo, wrap, stats, (pool, shm.name, workers), h_hint=h_hint)
+        del shared
+        return hull
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+def _chan(pts, demo, wrap, stats=None, parallel=None, on_step=None, h_hint=None):
+    if demo:
+        steps = ChanTrace(on_step)
+        steps.start()
+
+    n = len(pts)
+    P = exact_coords(pts)
+    ring = None # ccw sub-hulls of the last round, as indices into pts
+    t = 1
+    m = min(n, max(4, h_hint or 0)) # 2^(2^t) for t = 1
+    if demo: steps.t(t)
+    while True:
+        r = math.ceil(n / m)
+        if demo: steps.m(t, m, r)
+        if stats is not None:
+            stats.rounds += 1
+            stats.tried.append((m, r))
+        if demo: steps.partition(partition(pts, m))
+
+        with _phase(stats, "subhulls"):
+            if ring is not None:
+                ring, offsets = _merge_subhulls(pts, P, ring, m, rank, stats)
+            else:
+                if parallel:
+                    ring, offsets = _parallel_subhulls(pts, m, stats, *parallel)
+                else:
+                    ring, offsets = hull_indices_batch(pts, np.minimum(np.arange(r + 1) * m, n), stats)
+                # later rounds only see these points, so only they need ranks
+                rank = _ranks(P, ring) if P.dtype != object else None
+        # the wrapping steps work on the exact coordinates, the demo shows pts
+        Hall = P[ring]
+        if demo:
+            shown = pts[ring]
+            steps.convex_hulls(np.split(shown, offsets[1:-1]), shown)
+        Vall = V = None
+        batch = P.dtype != object and (wrap == "batch" or (wrap == "auto" and r >= BATCH_WRAP_MIN_HULLS))
+
+        # Every sub-hull starts from its lowest point, so the lowest point of S
+        # is the first vertex of one of them
+        firsts = Hall[offsets[:-1]]
+        lowest = np.flatnonzero(firsts[:, 1] == firsts[:, 1].max())
+        cur = offsets[lowest[np.argmin(firsts[lowest, 0])]]
+        p1 = Hall[cur]
+        p0 = p1 + np.array([1, 0], dtype=p1.dtype) # arrive heading left
+        hull = [cur]
+        if demo: steps.start_wrap(cur)
+        if stats is not None: wrap_start = time.perf_counter()
+
+        for _ in range(2, m+2):
+            nxt = None
+            if batch:
+                cand, nxt = _batch_candidates(p0, p1, Hall, offsets, stats)
+            if nxt is None:
+                if V is None:
+                    Vall = Hall.tolist()
+                    V = [Vall[offsets[j]:offsets[j+1]] for j in range(r)]
+                cand = _tangent_candidates(V, offsets, cur, stats)
+                nxt = cand[0]
+                for c in cand[1:]:
+                    if turns_right(Vall[cur], Vall[nxt], Vall[c]):
+                        nxt = c
+                if stats is not None: stats.orient_tests += len(cand) - 1
+            if demo: steps.candidates(cand)
+
+            cur = nxt
+            pi = Hall[cur]
+            if demo: steps.chosen(cur)
+
+            hull.append(cur)
+            if demo: steps.hull(cur)
+
+            if np.all(Hall[hull[0]] == pi):
+                if demo: steps.final()
+                if stats is not None: stats.add_time("wrap", time.perf_counter() - wrap_start)
+                return steps if demo else pts[ring[hull[:-1]]]
+            p0, p1 = p1, pi
+        if stats is not None: stats.add_time("wrap", time.perf_counter() - wrap_start)
+        t += 1
+        m = min(n, m * m)
+        if demo: steps.increment(t)
+
+
+def _farthest(P, xs, ys, det, p, q):
+    # Index into xs/ys of the point farthest outside the edge p->q, i.e. with
+    # the most negative det = orient(p, q, pt). Ties go to the one farthest
+    # along p->q, an end of the segment the hull shares with the supporting
+    # line, so the point is always a hull vertex. Float dets are only close
+    # (and the filtered ones only keep their sign), so for floats they are
+    # computed again plainly, and every point within twice their error bound
+    # of the minimum is compared again exactly.
+    dx, dy = P[q, 0] - P[p, 0], P[q, 1] - P[p, 1]
+    if P.dtype != np.float64:
+        m = det.min()
+        near = np.flatnonzero(det == m)
+        if len(near) == 1:
+            return near[0]
+        along = (xs[near] - P[p, 0]) * dx + (ys[near] - P[p, 1]) * dy
+        return near[np.argmax(along)]
+    det = dy * (xs - P[p, 0]) - dx * (ys - P[p, 1])
+    m = det.min()
+    ex = max(xs.max() - P[p, 0], P[p, 0] - xs.min())
+    ey = max(ys.max() - P[p, 1], P[p, 1] - ys.min())
+    near = np.flatnonzero(det <= m + 2 * ORIENT_ERRBOUND * (abs(dy) * ex + abs(dx) * ey))
+    if len(near) == 1:
+        return near[0]
+    a, b = [Fraction(v) for v in P[p].tolist()], [Fraction(v) for v in P[q].tolist()]
+
+    def key(i):
+        x, y = Fraction(float(xs[i])), Fraction(float(ys[i]))
+        return ((b[1] - a[1]) * (x - a[0]) - (b[0] - a[0]) * (y - a[1]),
+                -((x - a[0]) * (b[0] - a[0]) + (y - a[1]) * (b[1] - a[1])))
+    return min(near.tolist(), key=key)
+
+
+def quickhull(pts, demo=False, prefilter=0, stats=None, on_step=None):
+    # input: np array of shape (n, 2) where n is the # of pts
+    # output: ccw convex hull vertices, like graham_scan()
+    # The line through the leftmost and rightmost points splits the points in
+    # two. For every edge p->q with points outside it, the one farthest out is
+    # a hull vertex c, and only the points outside p->c or c->q are left to
+    # look at; an edge with none outside is a hull edge. Each split is a
+    # couple of NumPy passes over the points left for its edge, and the edges
+    # still to do wait on an explicit stack, topmost next in ccw order, so
+    # there is no recursion depth to run out of. Fast when h is small: most
+    # points of a random cloud are gone after the first few splits. Edges
+    # with few points left (QUICKHULL_LEAF) are finished in one go, except
+    # in demo runs.
+    # prefilter, stats and on_step work as in graham_scan(); the stack counts
+    # are edges pushed onto and popped off the work stack.
+    pts = _prefilter(pts, prefilter, stats)
+    n = len(pts)
+    if demo:
+        steps = QuickTrace(pts, on_step)
+        steps.start()
+    if n == 0:
+        if demo: steps.final([])
+        return steps if demo else pts[:0]
+
+    with _phase(stats, "scan"):
+        P = exact_coords(pts)
+        x, y = P[:, 0], P[:, 1]
+        left = np.flatnonzero(x == x.min())
+        right = np.flatnonzero(x == x.max())
+        a = int(left[np.argmin(y[left])])
+        b = int(right[np.argmax(y[right])])
+        if P[a, 1] == P[b, 1] and P[a, 0] == P[b, 0]:
+            b = a
+        if demo: steps.extremes(a, b)
+
+        none = np.empty(0, dtype=np.int64)
+        if a == b:
+            work = [(a, a, none, none)]
+            tests = 0
+        else:
+            side = orient_filtered(P[a, 0], P[a, 1], P[b, 0], P[b, 1], x, y, stats)
+            lower = np.flatnonzero(side < 0)
+            upper = np.flatnonzero(side > 0)
+            work = [(b, a, upper, -side[upper]), (a, b, lower, side[lower])]
+            tests = n
+        pushes = len(work); pops = 0
+
+        ring = []
+        while work:
+            p, q, X, det = work.pop()
+            pops += 1
+            if len(X) == 0:
+                ring.append(p)
+                if demo: steps.vertex(p, q)
+                continue
+            if demo: steps.edge(p, q, X)
+            if not demo and len(X) <= QUICKHULL_LEAF:
+                # the hull of the few points left, walked ccw from p to q
+                sub = np.r_[p, q, X]
+                leaf = hull_indices(pts[sub], stats).tolist()
+                k = leaf.index(0)
+                chain = leaf[k:] + leaf[:k]
+                ring += sub[chain[:chain.index(1)]].tolist()
+                continue
+
+            xs, ys = P[X, 0], P[X, 1]
+            c = int(X[_farthest(P, xs, ys, det, p, q)])
+            if demo: steps.farthest(c)
+
+            # a point outside p->c is not outside c->q, so only the rest of
+            # them is tested against c->q
+            o1 = orient_filtered(P[p, 0], P[p, 1], P[c, 0], P[c, 1], xs, ys, stats)
+            out1 = o1 < 0
+            rest = ~out1
+            o2 = orient_filtered(P[c, 0], P[c, 1], P[q, 0], P[q, 1], xs[rest], ys[rest], stats)
+            out2 = o2 < 0
+            X1, X2 = X[out1], X[rest][out2]
+            tests += len(o1) + len(o2)
+            work.append((c, q, X2, o2[out2]))
+            work.append((p, c, X1, o1[out1]))
+            pushes += 2
+            if demo: steps.split(X1, X2)
+
+        # start from the lowest point on the canvas
+        R = P[ring].tolist()
+        start = max(range(len(ring)), key=lambda i: (R[i][1], -R[i][0]))
+        ring = ring[start:] + ring[:start]
+
+    if stats is not None:
+        stats.orient_tests += tests
+        stats.pushes += pushes
+        stats.pops += pops
+    if demo:
+        steps.final(ring)
+        return steps
+    return pts[ring]
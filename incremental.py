@@ -0,0 +1,106 @@
+from bisect import bisect_left
+import numpy as np
+
+from predicates import orient_sign
+
+
+# Online convex hull: points are inserted one at a time and the hull is kept
+# up to date, instead of recomputing it from all the points every time.
+# The hull is stored as its two monotone chains, each a list of (x, y) tuples
+# sorted by x (then y). Inserting a point finds its place with a binary search,
+# O(log h) orientation tests decide whether it changes the chain, and the
+# neighbours it makes redundant are dropped; every point is dropped at most
+# once, so that part is amortized O(1) per insertion.
+#
+# With undo=True every insertion also logs which chain entries it replaced,
+# and undo() takes back the last one in time proportional to that change;
+# window.py builds a sliding-window hull on this.
+
+
+def _insert(C, p, s, log=None):
+    # Insert p into the chain C, whose consecutive points all turn with sign s.
+    # Returns False if p lies on or behind the chain. If p goes in, log gets
+    # (C, position, replaced points) for undoing it.
+    i = bisect_left(C, p)
+    if i < len(C) and C[i] == p:
+        return False
+    if 0 < i < len(C) and s * orient_sign(C[i-1], p, C[i]) <= 0:
+        return False
+    j = i
+    while j >= 2 and s * orient_sign(C[j-2], C[j-1], p) <= 0:
+        j -= 1
+    k = i
+    while k + 1 < len(C) and s * orient_sign(p, C[k], C[k+1]) <= 0:
+        k += 1
+    if log is not None:
+        log.append((C, j, C[j:k]))
+    C[j:k] = [p]
+    return True
+
+
+def ring_vertices(lower, upper):
+    # the hull with chains lower and upper as a ccw (h, 2) array, starting
+    # from the lowest point on the canvas
+    if len(lower) < 2:
+        ring = list(lower)
+    else:
+        ring = lower[:-1] + upper[:0:-1]
+    if ring:
+        start = max(range(len(ring)), key=lambda i: (ring[i][1], -ring[i][0]))
+        ring = ring[start:] + ring[:start]
+    return np.array(ring).reshape(-1, 2)
+
+
+class IncrementalHull:
+
+    def __init__(self, pts=None, undo=False):
+        self.lower = [] # ccw part seen from below on the canvas (larger y)
+        self.upper = []
+        self.n = 0
+        self.log = [] if undo else None # per insertion, the chain changes
+        self._vertices = None
+        if pts is not None:
+            self.extend(pts)
+
+    def insert(self, p):
+        # add point p = (x, y); returns True if the hull changed
+        p = tuple(p.tolist()) if isinstance(p, np.ndarray) else tuple(p)
+        self.n += 1
+        entry = [] if self.log is not None else None
+        changed = _insert(self.lower, p, 1, entry)
+        changed = _insert(self.upper, p, -1, entry) or changed
+        if entry is not None:
+            self.log.append(entry)
+        if changed:
+            self._vertices = None
+        return changed
+
+    def undo(self):
+        # take back the last insert() not undone yet; needs undo=True
+        if self.log is None:
+            raise ValueError("IncrementalHull(undo=True) is needed for undo()")
+        if not self.log:
+            raise IndexError("nothing to undo")
+        entry = self.log.pop()
+        for C, j, replaced in reversed(entry):
+            C[j:j+1] = replaced
+        self.n -= 1
+        if entry:
+            self._vertices = None
+
+    def extend(self, pts):
+        # add all rows of an (n, 2) array; returns True if the hull changed
+        changed = False
+        for p in np.asarray(pts).tolist():
+            changed = self.insert(p) or changed
+        return changed
+
+    def vertices(self):
+        # ccw hull vertices as an (h, 2) array, starting from the lowest point
+        # on the canvas like graham_scan()
+        if self._vertices is None:
+            self._vertices = ring_vertices(self.lower, self.upper)
+        return self._vertices
+
+    def __len__(self):
+        return len(self.vertices())
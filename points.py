@@ -0,0 +1,82 @@
+import numpy as np
+
+
+# Point coordinates in one contiguous (capacity, 2) NumPy buffer, so the whole
+# set is an array view at any time instead of a list of tuples to convert.
+# The buffer doubles when it runs full, which makes append() amortized O(1).
+#
+# load() memory-maps a .npy file (np.load(mmap_mode='r')) and uses the map as
+# the buffer directly, so even millions of points load without reading them;
+# the map is read-only and has no spare room, so the first point added
+# afterwards copies it into a new, larger buffer in memory.
+
+MIN_CAPACITY = 64
+
+
+class PointStore:
+
+    def __init__(self, capacity=MIN_CAPACITY, dtype=np.int64):
+        self._buf = np.empty((max(capacity, 1), 2), dtype=dtype)
+        self._n = 0
+
+    def __len__(self):
+        return self._n
+
+    def array(self):
+        # the points as an (n, 2) view of the buffer. Rows already stored are
+        # never written again, so the view stays valid while points are added.
+        return self._buf[:self._n]
+
+    def _reserve(self, n):
+        # room for n points in a writable buffer
+        if n <= len(self._buf) and self._buf.flags.writeable:
+            return
+        cap = max(len(self._buf), MIN_CAPACITY)
+        while cap < n:
+            cap *= 2
+        buf = np.empty((cap, 2), dtype=self._buf.dtype)
+        buf[:self._n] = self._buf[:self._n]
+        self._buf = buf
+
+    def append(self, p):
+        # add one point p = (x, y)
+        self._reserve(self._n + 1)
+        self._buf[self._n] = p
+        self._n += 1
+
+    def extend(self, pts):
+        # add the rows of an (n, 2) array-like
+        pts = np.asarray(pts).reshape(-1, 2)
+        self._reserve(self._n + len(pts))
+        self._buf[self._n:self._n + len(pts)] = pts
+        self._n += len(pts)
+
+    def random(self, n, lo, hi, rng=None):
+        # add n points with integer coordinates uniform in [lo, hi], drawn in
+        # one call; returns them
+        rng = rng or np.random.default_rng()
+        start = self._n
+        self._reserve(start + n)
+        self._buf[start:start + n] = rng.integers(lo, hi, size=(n, 2), endpoint=True)
+        self._n += n
+        return self._buf[start:self._n]
+
+    def clear(self):
+        self._buf = np.empty((MIN_CAPACITY, 2), dtype=self._buf.dtype)
+        self._n = 0
+
+    def save(self, path):
+        # write the points to a .npy file. A loaded map is copied out first:
+        # saving over the file it maps would truncate it while it is read.
+        pts = self.array()
+        if isinstance(pts, np.memmap):
+            pts = np.array(pts)
+        np.save(path, pts)
+
+    def load(self, path):
+        # replace the points with the (n, 2) array of a .npy file, memory-mapped
+        pts = np.load(path, mmap_mode="r")
+        if pts.ndim != 2 or pts.shape[1] != 2:
+            raise ValueError(f"expected an (n, 2) array of points, got shape {pts.shape}")
+        self._buf = pts
+        self._n = len(pts)
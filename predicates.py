@@ -0,0 +1,74 @@
+from fractions import Fraction
+import numpy as np
+
+
+# Filtered orientation predicates. The float determinant of orient() can get
+# the sign wrong when the points are nearly collinear or the coordinates are
+# large. Here it is computed in floats first, together with an error bound
+# (Shewchuk, "Adaptive Precision Floating-Point Arithmetic and Fast Robust
+# Geometric Predicates", 1997): when |det| reaches the bound the sign is
+# certain. Only the few tests below it are redone exactly, in int64 when the
+# coordinates are small integers, else with Python ints / Fractions.
+#
+# Signs follow orient(): > 0 is a ccw turn on the canvas.
+
+EPS = 2.0 ** -53
+ORIENT_ERRBOUND = (3 + 16 * EPS) * EPS
+
+
+def orient_exact(p1, p2, p3):
+    # sign of orient(p1, p2, p3) in exact rational arithmetic
+    ax, ay, bx, by, cx, cy = (Fraction(v) for v in (*p1, *p2, *p3))
+    det = (by - ay) * (cx - ax) - (bx - ax) * (cy - ay)
+    return (det > 0) - (det < 0)
+
+
+def orient_sign(p1, p2, p3):
+    # exact sign of orient(p1, p2, p3) for points of Python ints or floats,
+    # e.g. rows of an array's tolist(); ints are exact anyway
+    t1 = (p2[1] - p1[1]) * (p3[0] - p1[0])
+    t2 = (p2[0] - p1[0]) * (p3[1] - p1[1])
+    det = t1 - t2
+    if isinstance(det, float) and abs(det) < ORIENT_ERRBOUND * (abs(t1) + abs(t2)):
+        return orient_exact(p1, p2, p3)
+    # int(): with NumPy scalar coordinates the comparisons are np.bool_,
+    # which do not subtract
+    return int(det > 0) - int(det < 0)
+
+
+def _exact_signs(ax, ay, bx, by, cx, cy):
+    vals = np.stack([ax, ay, bx, by, cx, cy]).astype(np.float64)
+    if np.all(vals == np.trunc(vals)) and np.all(np.abs(vals) < 2**30):
+        # small integers: differences below 2^31, products fit in int64
+        ax, ay, bx, by, cx, cy = vals.astype(np.int64)
+        return np.sign((by - ay) * (cx - ax) - (bx - ax) * (cy - ay))
+    # a point tested against a line through itself is the common case, e.g.
+    # the ends of a chain; those are 0 without any arithmetic
+    signs = np.zeros(vals.shape[1])
+    ax, ay, bx, by, cx, cy = vals
+    rest = np.flatnonzero(~(((ax == bx) & (ay == by)) | ((ax == cx) & (ay == cy)) | ((bx == cx) & (by == cy))))
+    rows = vals[:, rest].T.tolist()
+    signs[rest] = [orient_exact(r[0:2], r[2:4], r[4:6]) for r in rows]
+    return signs
+
+
+def orient_filtered(ax, ay, bx, by, cx, cy, stats=None):
+    # orient((ax, ay), (bx, by), (cx, cy)) elementwise over broadcastable
+    # arrays, with signs that are always exact: float64 results too close to
+    # call are replaced by the exact sign (-1, 0 or 1). int64 coordinates are
+    # taken to be exact already (see hull.exact_coords), object arrays hold
+    # Python ints; for both the plain determinant is returned.
+    t1 = (by - ay) * (cx - ax)
+    t2 = (bx - ax) * (cy - ay)
+    det = t1 - t2
+    if det.dtype != np.float64:
+        return det
+    unsure = np.abs(det) < ORIENT_ERRBOUND * (np.abs(t1) + np.abs(t2))
+    if unsure.any():
+        k = np.flatnonzero(unsure)
+        args = [np.broadcast_to(v, det.shape).ravel()[k] for v in (ax, ay, bx, by, cx, cy)]
+        det = det.ravel()
+        det[k] = _exact_signs(*args)
+        det = det.reshape(t1.shape)
+        if stats is not None: stats.exact_tests += len(k)
+    return det
@@ -0,0 +1,201 @@
+import numpy as np
+
+from predicates import orient_filtered
+
+
+# Queries against a finished hull. HullQuery takes the ccw vertices returned by
+# graham_scan() or chan() and answers whole batches of queries at once: every
+# query point or direction is located with a binary search over the hull,
+# O(log h) per query, run as a few NumPy passes over the batch.
+#
+# Orientation signs are exact (see predicates.py) for coordinates float64 holds
+# exactly, i.e. any floats and integers up to 2^53. Diameter, width and the
+# bounding rectangle are plain float results.
+
+
+class HullQuery:
+
+    def __init__(self, ccw):
+        # ccw: (h, 2) hull vertices, in the order graham_scan() and chan() give
+        self.vertices = np.asarray(ccw).reshape(-1, 2)
+        h = len(self.vertices)
+        if h == 0:
+            raise ValueError("the hull has no vertices")
+        self._V = self.vertices.astype(np.float64)
+        self._E = np.roll(self._V, -1, axis=0) - self._V # edge i runs from vertex i to i+1
+
+        # Outward normals of the edges, sorted by angle. The vertex extreme in a
+        # direction is the one shared by the two edges whose normals bracket it
+        ex, ey = self._E[:, 0], self._E[:, 1]
+        normal = np.arctan2(ex, -ey)
+        by_angle = np.argsort(normal)
+        self._angles = normal[by_angle]
+        e1, e2 = np.roll(by_angle, 1), by_angle
+        self._gap_vertex = np.where(e2 == (e1 - 1) % h, e1, e2)
+
+    def __len__(self):
+        return len(self.vertices)
+
+    def _orient_edges(self, e, x, y):
+        # orient(vertex e, vertex e+1, (x, y)) for arrays of edge indices e
+        V = self._V
+        f = (e + 1) % len(V)
+        return orient_filtered(V[e, 0], V[e, 1], V[f, 0], V[f, 1], x, y)
+
+    def _fan(self, x, y):
+        # Locate points in the fan of triangles around vertex 0. Returns the
+        # orientations against its two edges, the wedge i (1..h-2) between the
+        # rays to vertices i and i+1 and the orientation against edge i, which
+        # closes that wedge.
+        V = self._V
+        h = len(V)
+        first = orient_filtered(V[0, 0], V[0, 1], V[1, 0], V[1, 1], x, y)
+        last = orient_filtered(V[0, 0], V[0, 1], V[-1, 0], V[-1, 1], x, y)
+        lo = np.ones(len(x), dtype=np.int64)
+        hi = np.full(len(x), h - 1, dtype=np.int64)
+        while np.any(hi - lo > 1):
+            mid = (lo + hi) // 2
+            ccw = orient_filtered(V[0, 0], V[0, 1], V[mid, 0], V[mid, 1], x, y) >= 0
+            lo = np.where(ccw, mid, lo)
+            hi = np.where(ccw, hi, mid)
+        return first, last, lo, self._orient_edges(lo, x, y)
+
+    def locate(self, pts):
+        # for every row of pts: 1 inside the hull, 0 on its boundary, -1 outside
+        Q = np.asarray(pts).reshape(-1, 2).astype(np.float64)
+        x, y = Q[:, 0], Q[:, 1]
+        V = self._V
+        if len(V) < 3:
+            a, b = V[0], V[-1]
+            o = orient_filtered(a[0], a[1], b[0], b[1], x, y)
+            on = ((o == 0) & (x >= min(a[0], b[0])) & (x <= max(a[0], b[0]))
+                  & (y >= min(a[1], b[1])) & (y <= max(a[1], b[1])))
+            return np.where(on, 0, -1).astype(np.int8)
+        first, last, _, edge = self._fan(x, y)
+        inside = (first >= 0) & (last <= 0) & (edge >= 0)
+        out = np.where(inside, 1, -1).astype(np.int8)
+        out[inside & ((first == 0) | (last == 0) | (edge == 0))] = 0
+        return out
+
+    def contains(self, pts, boundary=True):
+        # True for the rows of pts inside the hull, or on it if boundary
+        where = self.locate(pts)
+        return where >= 0 if boundary else where > 0
+
+    def extreme(self, directions):
+        # index of the vertex farthest along every row (dx, dy) of directions
+        D = np.asarray(directions, dtype=np.float64).reshape(-1, 2)
+        if len(self._V) < 3:
+            return np.argmax(D @ self._V.T, axis=1)
+        k = np.searchsorted(self._angles, np.arctan2(D[:, 1], D[:, 0]))
+        return self._gap_vertex[k % len(self._V)]
+
+    def tangents(self, pts):
+        # For points outside the hull, where the part of the hull they see
+        # starts and ends going ccw: (first, last) vertex index arrays. The
+        # lines from a point through those two vertices touch the hull without
+        # crossing it. Both are -1 for points inside or on the hull.
+        Q = np.asarray(pts).reshape(-1, 2).astype(np.float64)
+        x, y = Q[:, 0], Q[:, 1]
+        V = self._V
+        h = len(V)
+        first_v = np.full(len(Q), -1, dtype=np.int64)
+        last_v = np.full(len(Q), -1, dtype=np.int64)
+        if h < 3:
+            out = self.locate(Q) < 0
+            if h == 1:
+                first_v[out] = last_v[out] = 0
+                return first_v, last_v
+            o = orient_filtered(V[0, 0], V[0, 1], V[1, 0], V[1, 1], x, y)
+            near = np.where(np.hypot(x - V[0, 0], y - V[0, 1]) <= np.hypot(x - V[1, 0], y - V[1, 1]), 0, 1)
+            first_v[out] = np.where(o < 0, 0, np.where(o > 0, 1, near))[out]
+            last_v[out] = np.where(o < 0, 1, np.where(o > 0, 0, near))[out]
+            return first_v, last_v
+
+        first, last, wedge, edge = self._fan(x, y)
+        out = ~((first >= 0) & (last <= 0) & (edge >= 0))
+        x, y = x[out], y[out]
+
+        # An edge the point sees: one of the two at vertex 0, or else the edge
+        # closing its wedge of the fan
+        j = np.where(first[out] < 0, 0, np.where(last[out] > 0, h - 1, wedge[out]))
+        # ... and one it does not see: the edge with the outward normal opposite
+        # to edge j has the whole hull between itself and the point, and one of
+        # the two edges at the vertex extreme in that direction is as good
+        u = self.extreme(np.c_[self._E[j, 1], -self._E[j, 0]])
+        k = np.where(self._orient_edges(u, x, y) >= 0, u, (u - 1) % h)
+        missed = np.flatnonzero(self._orient_edges(k, x, y) < 0)
+        for i in missed:
+            # float angles picked a neighbour of the right vertex; find any edge
+            k[i] = np.argmax(self._orient_edges(np.arange(h), x[i], y[i]) >= 0)
+
+        # The seen edges are a contiguous run containing j and not k, so from j
+        # to k either way there is one change from seen to unseen
+        def search(step, length):
+            lo = np.zeros(len(j), dtype=np.int64)
+            hi = length
+            while np.any(hi - lo > 1):
+                mid = (lo + hi) // 2
+                seen = self._orient_edges((j + step * mid) % h, x, y) < 0
+                lo = np.where(seen, mid, lo)
+                hi = np.where(seen, hi, mid)
+            return (j + step * hi) % h # first unseen edge that way
+
+        last_v[out] = search(1, (k - j) % h)
+        first_v[out] = (search(-1, (j - k) % h) + 1) % h
+        return first_v, last_v
+
+    def _opposite(self):
+        # for every edge the vertex farthest from it, on the hull's side
+        return self.extreme(np.c_[self._E[:, 1], -self._E[:, 0]])
+
+    def diameter(self):
+        # (d, i, j): the largest distance between two vertices i and j, by
+        # rotating calipers; only antipodal pairs are compared
+        V = self._V
+        h = len(V)
+        if h < 3:
+            return float(np.hypot(*(V[-1] - V[0]))), 0, h - 1
+        a = self._opposite()
+        # while the calipers turn around vertex i+1 from edge i to edge i+1,
+        # the other side moves from a[i] to a[i+1]
+        count = (np.roll(a, -1) - a) % h + 1
+        i = np.repeat((np.arange(h) + 1) % h, count)
+        step = np.arange(count.sum()) - np.repeat(np.cumsum(count) - count, count)
+        j = (np.repeat(a, count) + step) % h
+        d = np.hypot(V[i, 0] - V[j, 0], V[i, 1] - V[j, 1])
+        best = np.argmax(d)
+        return float(d[best]), int(i[best]), int(j[best])
+
+    def width(self):
+        # (w, i): the smallest distance between two parallel lines holding the
+        # hull between them; one of them runs along edge i
+        V = self._V
+        if len(V) < 3:
+            return 0.0, 0
+        a = self._opposite()
+        E = self._E
+        d = (E[:, 1] * (V[a, 0] - V[:, 0]) - E[:, 0] * (V[a, 1] - V[:, 1])) / np.hypot(E[:, 0], E[:, 1])
+        best = np.argmin(d)
+        return float(d[best]), int(best)
+
+    def min_area_rect(self):
+        # (area, corners): the smallest-area rectangle around the hull, with
+        # its 4 corners ccw. One of its sides lies on a hull edge (Freeman and
+        # Shapira), so each edge is tried with calipers at its extreme vertices
+        # along the edge, against it and away from it.
+        V = self._V
+        if len(V) < 3:
+            return 0.0, V[[0, -1, -1, 0]]
+        E = self._E
+        u = E / np.hypot(E[:, 0], E[:, 1])[:, None] # along the edge
+        w = np.c_[u[:, 1], -u[:, 0]]                 # into the hull
+        s_max = np.sum(V[self.extreme(u)] * u, axis=1)
+        s_min = np.sum(V[self.extreme(-u)] * u, axis=1)
+        t_min = np.sum(V * w, axis=1)
+        t_max = np.sum(V[self.extreme(w)] * w, axis=1)
+        area = (s_max - s_min) * (t_max - t_min)
+        k = np.argmin(area)
+        corners = np.array([s * u[k] + t * w[k] for s, t in
+                            [(s_min[k], t_min[k]), (s_max[k], t_min[k]), (s_max[k], t_max[k]), (s_min[k], t_max[k])]])
+        return float(area[k]), corners
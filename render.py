@@ -0,0 +1,114 @@
+import base64
+import numpy as np
+
+
+# Canvas rendering helpers for the GUI that do not need tkinter themselves.
+# PointRaster stamps dense point clouds into one RGB buffer, shown as a single
+# canvas image instead of one oval item per point. CanvasLayer keeps the items
+# of a demo step and, going to the next step, only deletes and creates the
+# items that changed.
+
+
+def disk_offsets(radius):
+    # (dy, dx) of the pixels of a filled disk
+    d = np.arange(-radius, radius + 1)
+    dy, dx = np.meshgrid(d, d, indexing="ij")
+    inside = dx * dx + dy * dy <= radius * radius + radius
+    return dy[inside], dx[inside]
+
+
+class PointRaster:
+
+    def __init__(self, width, height, radius=3, bg=(255, 255, 255)):
+        self.width, self.height = width, height
+        self.bg = bg
+        self.dy, self.dx = disk_offsets(radius)
+        self.pixels = np.empty((height, width, 3), dtype=np.uint8)
+        self.clear()
+
+    def clear(self):
+        self.pixels[:] = self.bg
+
+    def stamp(self, pts, color):
+        # draw a dot of the given (r, g, b) color at every row (x, y) of pts
+        pts = np.asarray(pts).reshape(-1, 2)
+        if len(pts) == 0:
+            return
+        if len(pts) * len(self.dy) < self.width * self.height // 16:
+            xy = np.rint(pts).astype(np.int64)
+            ys = (xy[:, 1, None] + self.dy).ravel()
+            xs = (xy[:, 0, None] + self.dx).ravel()
+            ok = (xs >= 0) & (xs < self.width) & (ys >= 0) & (ys < self.height)
+            self.pixels[ys[ok], xs[ok]] = color
+            return
+        # Many points: mark the dot centers in a mask with a margin of the dot
+        # radius and grow them into disks by shifting the mask, so the work
+        # depends on the canvas size rather than on the number of points
+        r = int(max(np.abs(self.dy).max(), np.abs(self.dx).max()))
+        xy = np.rint(pts).astype(np.int64) + r
+        ok = (xy[:, 0] >= 0) & (xy[:, 0] < self.width + 2 * r) & (xy[:, 1] >= 0) & (xy[:, 1] < self.height + 2 * r)
+        centers = np.zeros((self.height + 2 * r, self.width + 2 * r), dtype=bool)
+        centers[xy[ok, 1], xy[ok, 0]] = True
+        mask = np.zeros((self.height, self.width), dtype=bool)
+        for dy, dx in zip(self.dy, self.dx):
+            mask |= centers[r - dy:r - dy + self.height, r - dx:r - dx + self.width]
+        self.pixels[mask] = color
+
+    def ppm(self):
+        # the buffer as base64 PPM data, for PhotoImage(data=..., format="ppm")
+        header = f"P6 {self.width} {self.height} 255\n".encode()
+        return base64.b64encode(header + self.pixels.tobytes()).decode()
+
+
+# Canvas items are described as hashable (kind, coords, options) tuples, so two
+# steps can be compared item by item.
+
+def oval(x, y, r, outline, fill):
+    return ("oval", (x-r, y-r, x+r, y+r), (("fill", fill), ("outline", outline)))
+
+
+def line(coords, fill, width=2, dash=None):
+    options = (("fill", fill), ("width", width))
+    if dash is not None:
+        options += (("dash", dash),)
+    return ("line", tuple(coords), options)
+
+
+def hull_items(ccw_vertices, color, dots=True):
+    # the closed polygon as one line item, plus a dot on every vertex
+    if len(ccw_vertices) == 0:
+        return []
+    coords = [c for pt in ccw_vertices for c in pt] + list(ccw_vertices[0])
+    items = [oval(x, y, 3, color, color) for x, y in ccw_vertices] if dots else []
+    if len(ccw_vertices) > 1:
+        items.append(line(coords, color))
+    return items
+
+
+class CanvasLayer:
+
+    def __init__(self, canvas, tag):
+        self.canvas = canvas
+        self.tag = tag
+        self.items = {} # (kind, coords, options) -> canvas item id
+
+    def draw(self, specs):
+        # show exactly the given items, stacked in the given order
+        wanted = set(specs)
+        for spec in [s for s in self.items if s not in wanted]:
+            self.canvas.delete(self.items.pop(spec))
+        created = False
+        for spec in specs:
+            item = self.items.get(spec)
+            if item is None:
+                kind, coords, options = spec
+                create = self.canvas.create_oval if kind == "oval" else self.canvas.create_line
+                self.items[spec] = create(*coords, tags=self.tag, **dict(options))
+                created = True
+            elif created:
+                # keep the stacking order of a full redraw
+                self.canvas.tag_raise(item)
+
+    def clear(self):
+        self.canvas.delete(self.tag)
+        self.items = {}
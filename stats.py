@@ -0,0 +1,74 @@
+# Optional run statistics. Pass a HullStats as stats= to graham_scan() or
+# chan() and they fill it in; leaving it as None skips all of the bookkeeping.
+#
+# Counters are added up in local variables and stored once per call, and the
+# phase timers are only started when stats is given, so a run without stats
+# pays one "is None" check per call or phase.
+
+import time
+from contextlib import contextmanager
+
+
+class HullStats:
+
+    def __init__(self):
+        self.n = 0             # points given to the algorithm
+        self.culled = 0        # points dropped by the Akl-Toussaint pre-filter
+        self.orient_tests = 0  # orientation tests, scalar or per array element
+        self.angle_calls = 0   # angles computed, scalar or per array element
+        self.exact_tests = 0   # float orientation tests redone exactly (array passes)
+        self.pushes = 0        # points pushed onto a scan stack / chain
+        self.pops = 0          # points popped off it again
+        self.rounds = 0        # chan() rounds
+        self.tried = []        # (m, r) of every chan() round
+        self.times = {}        # wall time in seconds per phase
+        self.engine = None     # engine dispatch.auto() picked, and why
+        self.reason = None
+
+    @contextmanager
+    def phase(self, name):
+        # with stats.phase("sort"): ... adds the time spent to times["sort"].
+        # Phases can nest: in chan() the "sort" and "scan" of the sub-hulls are
+        # part of "subhulls", and with workers they add up the workers' time.
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - start)
+
+    def add_time(self, name, seconds):
+        self.times[name] = self.times.get(name, 0.0) + seconds
+
+    def merge(self, other):
+        # add the counters and times of other, e.g. from a worker process
+        for key, value in vars(other).items():
+            if key == "times":
+                for name, t in value.items():
+                    self.add_time(name, t)
+            elif key == "tried":
+                self.tried.extend(value)
+            elif key not in ("n", "engine", "reason"):
+                setattr(self, key, getattr(self, key) + value)
+
+    def as_dict(self):
+        d = dict(vars(self))
+        d["times"] = dict(self.times)
+        d["tried"] = list(self.tried)
+        return d
+
+    def summary(self):
+        # a few lines of text for logs and the GUI
+        lines = [f"n={self.n} culled={self.culled} rounds={self.rounds}"]
+        if self.engine is not None:
+            lines.insert(0, f"auto: {self.engine} ({self.reason})")
+        if self.tried:
+            lines.append("m, r tried: " + ", ".join(f"({m}, {r})" for m, r in self.tried))
+        lines.append(f"orient={self.orient_tests} exact={self.exact_tests} angle={self.angle_calls} "
+                     f"push={self.pushes} pop={self.pops}")
+        if self.times:
+            lines.append(" ".join(f"{name}={t * 1000:.2f}ms" for name, t in self.times.items()))
+        return "\n".join(lines)
+
+    def __repr__(self):
+        fields = ", ".join(f"{k}={v}" for k, v in vars(self).items())
+        return f"HullStats({fields})"
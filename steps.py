@@ -0,0 +1,354 @@
+from array import array
+from bisect import bisect_right
+from fractions import Fraction
+import numpy as np
+
+
+# Compact demo traces for graham_scan(), chan() and quickhull(). Instead of copying the
+# stack / hull into every step, a trace keeps one record of a few ints per step
+# (the delta: what was pushed, popped, tested or chosen) and rebuilds a step in
+# the old format when it is indexed, so trace[i] can be used just like the old
+# list of steps in gs_step_event() / chan_step_event().
+#
+# A trace can be read while it is still being recorded, e.g. by the GUI while
+# a worker thread runs the algorithm: on_step(trace) is called after every
+# recorded step, and steps below the length passed on are complete. Raising
+# from on_step aborts the run.
+
+
+class GrahamTrace:
+    # Steps of graham_scan(pts, demo=True), in order:
+    #   'start', boundary_pt, [p1, p2] (or [p1] if all points are p1),
+    #   ("test", stack, pt) / ("popped", stack, pt) / ("push", stack) ...,
+    #   final stack
+    # The stack is kept as indices into pts. Walking one step forward or back
+    # applies or undoes a single delta, and any other step is rebuilt from the
+    # nearest checkpoint. A checkpoint is only taken once at least as many
+    # deltas as stack entries went by since the last one, so checkpoints never
+    # take more memory than the deltas themselves.
+
+    START, BOUNDARY, INIT, TEST, POPPED, PUSH, FINAL = range(7)
+    MIN_CHECKPOINT_GAP = 64
+
+    def __init__(self, pts, on_step=None):
+        self.pts = pts
+        self.on_step = on_step
+        self.kinds = array('b')
+        self.args = array('l')  # tested / pushed / popped point index
+        self.checkpoints = {}   # step -> stack after that step
+        self._checkpoint_steps = array('l')
+        self._stack = []        # stack while recording
+        self._since_checkpoint = 0
+        self._pos = None        # step whose stack is in self._view
+        self._view = []
+
+    def _record(self, kind, arg=-1):
+        self.kinds.append(kind)
+        self.args.append(arg)
+        self._since_checkpoint += 1
+        if self._since_checkpoint >= max(self.MIN_CHECKPOINT_GAP, len(self._stack)):
+            self._checkpoint()
+        if self.on_step is not None:
+            self.on_step(self)
+
+    def _checkpoint(self):
+        k = len(self.kinds) - 1
+        self.checkpoints[k] = array('l', self._stack)
+        self._checkpoint_steps.append(k)
+        self._since_checkpoint = 0
+
+    # Recording, called by graham_scan()
+
+    def start(self, boundary):
+        self._record(self.START)
+        self._record(self.BOUNDARY, boundary)
+
+    def init(self, a, b=None):
+        # b is None when all points are the same one
+        self._stack = [a] if b is None else [a, b]
+        self.kinds.append(self.INIT)
+        self.args.append(-1)
+        self._checkpoint()
+        if self.on_step is not None:
+            self.on_step(self)
+
+    def test(self, i):
+        self._record(self.TEST, i)
+
+    def pop(self):
+        self._record(self.POPPED, self._stack.pop())
+
+    def push(self, i):
+        self._stack.append(i)
+        self._record(self.PUSH, i)
+
+    def final(self):
+        self._record(self.FINAL)
+
+    # Replay
+
+    def _apply(self, k):
+        kind = self.kinds[k]
+        if kind == self.PUSH:
+            self._view.append(self.args[k])
+        elif kind == self.POPPED:
+            self._view.pop()
+
+    def _undo(self, k):
+        kind = self.kinds[k]
+        if kind == self.PUSH:
+            self._view.pop()
+        elif kind == self.POPPED:
+            self._view.append(self.args[k])
+
+    def _seek(self, k):
+        if self._pos is not None and k == self._pos + 1:
+            self._apply(k)
+        elif self._pos is not None and k == self._pos - 1:
+            self._undo(self._pos)
+        elif k != self._pos:
+            base = self._checkpoint_steps[bisect_right(self._checkpoint_steps, k) - 1]
+            self._view = list(self.checkpoints[base])
+            for j in range(base + 1, k + 1):
+                self._apply(j)
+        self._pos = k
+
+    def _tested(self, k):
+        # point being tested at step k: a popped step keeps testing the point
+        # of the last test before it
+        while self.kinds[k] != self.TEST:
+            k -= 1
+        return self.pts[self.args[k]]
+
+    def __len__(self):
+        return len(self.kinds)
+
+    def __getitem__(self, k):
+        if k < 0:
+            k += len(self)
+        if not 0 <= k < len(self):
+            raise IndexError("step out of range")
+        kind = self.kinds[k]
+        if kind == self.START:
+            return 'start'
+        if kind == self.BOUNDARY:
+            return self.pts[self.args[k]]
+        self._seek(k)
+        stack = self.pts[self._view]
+        if kind == self.TEST:
+            return ("test", stack, self.pts[self.args[k]])
+        if kind == self.POPPED:
+            return ("popped", stack, self._tested(k))
+        if kind == self.PUSH:
+            return ("push", stack)
+        return stack
+
+
+class ChanTrace:
+    # Steps of chan(pts, demo=True), in the old format:
+    #   ('start', None), ('t', t), ('m', (t, m, r)), ('partition', S),
+    #   ('convex_hulls', H), ('start_wrap', H, p1), ('candidates', H, q, hull),
+    #   ('chosen', H, q, hull, pi), ('hull', H, hull, (t, m, r)),
+    #   ('final', H, hull), ('increment', t)
+    # The partition and sub-hulls are stored once per round, with the sub-hulls
+    # also concatenated (Hall) so that points can be referred to by index. The
+    # wrapped hull only grows within a round, so every step just remembers its
+    # round, how long the hull was and which candidate set it showed.
+
+    KINDS = ['start', 't', 'm', 'partition', 'convex_hulls', 'start_wrap',
+             'candidates', 'chosen', 'hull', 'final', 'increment']
+
+    def __init__(self, on_step=None):
+        self.on_step = on_step
+        self.kinds = array('b')
+        self.rounds = array('l')  # round of the step, or t for 't'/'increment'
+        self.sizes = array('l')   # hull length shown by the step
+        self.picks = array('l')   # candidate set of the step
+        self._rounds = []         # per round: [(t, m, r), S, H, Hall, hull]
+        self._candidates = []     # per wrapping step: [q, pi] as Hall indices
+
+    def _record(self, kind, rnd=-1, size=0, pick=-1):
+        self.kinds.append(self.KINDS.index(kind))
+        self.rounds.append(rnd)
+        self.sizes.append(size)
+        self.picks.append(pick)
+        if self.on_step is not None:
+            self.on_step(self)
+
+    # Recording, called by chan()
+
+    def start(self):
+        self._record('start')
+
+    def t(self, t):
+        self._record('t', t)
+
+    def m(self, t, m, r):
+        self._rounds.append([(t, m, r), None, None, None, array('l')])
+        self._record('m', len(self._rounds) - 1)
+
+    def partition(self, S):
+        self._rounds[-1][1] = [np.asarray(Si) for Si in S]
+        self._record('partition', len(self._rounds) - 1)
+
+    def convex_hulls(self, H, Hall):
+        self._rounds[-1][2] = H
+        self._rounds[-1][3] = Hall
+        self._record('convex_hulls', len(self._rounds) - 1)
+
+    def start_wrap(self, i):
+        self._rounds[-1][4].append(i)
+        self._record('start_wrap', len(self._rounds) - 1, 1)
+
+    def candidates(self, cand):
+        self._candidates.append([np.asarray(cand), -1])
+        self._record('candidates', len(self._rounds) - 1, len(self._rounds[-1][4]), len(self._candidates) - 1)
+
+    def chosen(self, i):
+        self._candidates[-1][1] = i
+        self._record('chosen', len(self._rounds) - 1, len(self._rounds[-1][4]), len(self._candidates) - 1)
+
+    def hull(self, i):
+        self._rounds[-1][4].append(i)
+        self._record('hull', len(self._rounds) - 1, len(self._rounds[-1][4]))
+
+    def final(self):
+        self._record('final', len(self._rounds) - 1, len(self._rounds[-1][4]) - 1)
+
+    def increment(self, t):
+        self._record('increment', t)
+
+    # Replay
+
+    def __len__(self):
+        return len(self.kinds)
+
+    def __getitem__(self, k):
+        if k < 0:
+            k += len(self)
+        if not 0 <= k < len(self):
+            raise IndexError("step out of range")
+        kind = self.KINDS[self.kinds[k]]
+        if kind == 'start':
+            return ('start', None)
+        if kind in ('t', 'increment'):
+            return (kind, self.rounds[k])
+        params, S, H, Hall, hull = self._rounds[self.rounds[k]]
+        if kind == 'm':
+            return ('m', params)
+        if kind == 'partition':
+            return ('partition', S)
+        if kind == 'convex_hulls':
+            return ('convex_hulls', H)
+        hull = Hall[hull[:self.sizes[k]]]
+        if kind == 'start_wrap':
+            return ('start_wrap', H, hull[0])
+        if kind == 'candidates':
+            return ('candidates', H, Hall[self._candidates[self.picks[k]][0]], hull)
+        if kind == 'chosen':
+            q, pi = self._candidates[self.picks[k]]
+            return ('chosen', H, Hall[q], hull, Hall[pi])
+        if kind == 'hull':
+            return ('hull', H, hull, params)
+        return ('final', H, hull)
+
+
+class QuickTrace:
+    # Steps of quickhull(pts, demo=True):
+    #   ('start', None), ('extremes', a, b),
+    #   ('edge', hull, p, q, X)              edge p->q off the stack, X outside it
+    #   ('farthest', hull, p, q, X, c)       c: the point of X farthest outside
+    #   ('split', hull, p, c, q, X1, X2)     the new edges p->c and c->q with the
+    #                                        points outside each
+    #   ('vertex', hull, p, q)               nothing outside p->q, p is final
+    #   ('final', hull)
+    # hull is the polygon of the vertices found so far. The outside sets are
+    # stored once, as index arrays. Every vertex found gets a position key
+    # halfway between the keys of the edge it splits, so the polygon of any
+    # step is the vertices found by then, sorted by key.
+
+    KINDS = ['start', 'extremes', 'edge', 'farthest', 'split', 'vertex', 'final']
+
+    def __init__(self, pts, on_step=None):
+        self.pts = pts
+        self.on_step = on_step
+        self.kinds = array('b')
+        self.edges = array('l')  # edge of the step, index into self._edges
+        self.sizes = array('l')  # vertices found by the step
+        self._edges = []         # [p, q, X, c, X1, X2] per edge taken off the stack
+        self._found = []         # vertices in the order they were found
+        self._keys = {}          # vertex -> position key along the hull
+        self._first = -1
+        self._ring = None
+
+    def _record(self, kind):
+        self.kinds.append(self.KINDS.index(kind))
+        self.edges.append(len(self._edges) - 1)
+        self.sizes.append(len(self._found))
+        if self.on_step is not None:
+            self.on_step(self)
+
+    # Recording, called by quickhull()
+
+    def start(self):
+        self._record('start')
+
+    def extremes(self, a, b):
+        self._first = a
+        self._keys = {b: Fraction(1), a: Fraction(0)}
+        self._found = [a] if a == b else [a, b]
+        self._edges.append([a, b, None, -1, None, None])
+        self._record('extremes')
+
+    def edge(self, p, q, X):
+        self._edges.append([p, q, X, -1, None, None])
+        self._record('edge')
+
+    def farthest(self, c):
+        self._edges[-1][3] = c
+        self._record('farthest')
+
+    def split(self, X1, X2):
+        p, q, _, c = self._edges[-1][:4]
+        # the edge back to the first vertex closes the polygon: its key is 2
+        kq = Fraction(2) if q == self._first else self._keys[q]
+        self._keys[c] = (self._keys[p] + kq) / 2
+        self._found.append(c)
+        self._edges[-1][4:] = [X1, X2]
+        self._record('split')
+
+    def vertex(self, p, q):
+        self._edges.append([p, q, None, -1, None, None])
+        self._record('vertex')
+
+    def final(self, ring):
+        self._ring = ring
+        self._record('final')
+
+    # Replay
+
+    def __len__(self):
+        return len(self.kinds)
+
+    def __getitem__(self, k):
+        if k < 0:
+            k += len(self)
+        if not 0 <= k < len(self):
+            raise IndexError("step out of range")
+        kind = self.KINDS[self.kinds[k]]
+        pts = self.pts
+        if kind == 'start':
+            return ('start', None)
+        if kind == 'final':
+            return ('final', pts[self._ring])
+        p, q, X, c, X1, X2 = self._edges[self.edges[k]]
+        if kind == 'extremes':
+            return ('extremes', pts[p], pts[q])
+        hull = pts[sorted(self._found[:self.sizes[k]], key=self._keys.__getitem__)]
+        if kind == 'edge':
+            return ('edge', hull, pts[p], pts[q], pts[X])
+        if kind == 'farthest':
+            return ('farthest', hull, pts[p], pts[q], pts[X], pts[c])
+        if kind == 'split':
+            return ('split', hull, pts[p], pts[c], pts[q], pts[X1], pts[X2])
+        return ('vertex', hull, pts[p], pts[q])
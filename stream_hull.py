@@ -0,0 +1,99 @@
+import argparse
+import sys
+import time
+import numpy as np
+
+from hull import akl_toussaint, hull_indices
+
+
+# Out-of-core convex hull of a point file. The file is memory-mapped and read
+# in fixed-size chunks; each chunk is merged into the running hull, so peak
+# memory is O(chunk + h) no matter how many points the file holds.
+#
+#   $ python stream_hull.py points.npy -o hull.npy --chunk-size 1000000
+#   $ python stream_hull.py points.bin --dtype int32 -o hull.csv
+#
+# .npy files are mapped with np.load(mmap_mode='r'); anything else is read as
+# raw interleaved x, y values of --dtype.
+
+
+def load_points(path, dtype=None):
+    if path.endswith(".npy"):
+        pts = np.load(path, mmap_mode="r")
+    else:
+        if dtype is None:
+            raise ValueError("raw point files need a --dtype")
+        pts = np.memmap(path, dtype=dtype, mode="r")
+        pts = pts[:len(pts) // 2 * 2].reshape(-1, 2)
+    if pts.ndim != 2 or pts.shape[1] != 2:
+        raise ValueError(f"expected an (n, 2) array of points, got shape {pts.shape}")
+    return pts
+
+
+def streaming_hull(pts, chunk_size=1_000_000, prefilter=8, progress=None):
+    # input: (n, 2) array-like, typically a memory map
+    # output: ccw convex hull vertices, like graham_scan()
+    # progress(done, n, h) is called after every chunk
+    n = len(pts)
+    hull = np.empty((0, 2), dtype=pts.dtype)
+    for start in range(0, n, chunk_size):
+        chunk = np.array(pts[start:start + chunk_size])
+        if prefilter and len(chunk) > 16:
+            chunk = chunk[akl_toussaint(chunk, prefilter)]
+        merged = np.concatenate([hull, chunk])
+        hull = merged[hull_indices(merged)]
+        if progress is not None:
+            progress(min(start + chunk_size, n), n, len(hull))
+    return hull
+
+
+def save_points(path, pts):
+    if path.endswith(".csv") or path.endswith(".txt"):
+        fmt = "%d" if np.issubdtype(pts.dtype, np.integer) else "%.17g"
+        np.savetxt(path, pts, fmt=fmt, delimiter=",")
+    else:
+        np.save(path, pts)
+
+
+def positive_int(text):
+    value = int(text)
+    if value <= 0:
+        raise argparse.ArgumentTypeError(f"must be positive, got {value}")
+    return value
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Convex hull of a large point file, streamed in chunks.")
+    parser.add_argument("input", help=".npy file of shape (n, 2), or a raw binary file of interleaved x, y")
+    parser.add_argument("-o", "--output", help="where to write the hull vertices (.npy, .csv or .txt)")
+    parser.add_argument("--dtype", help="element type of a raw input file, e.g. float64 or int32")
+    parser.add_argument("--chunk-size", type=positive_int, default=1_000_000, help="points read per chunk")
+    parser.add_argument("--prefilter", type=int, choices=[0, 4, 8], default=8,
+                        help="Akl-Toussaint directions used to cull each chunk (0 = off)")
+    parser.add_argument("-v", "--verbose", action="store_true", help="report every chunk")
+    args = parser.parse_args(argv)
+    if not args.input.endswith(".npy") and args.dtype is None:
+        parser.error("raw point files need a --dtype")
+
+    try:
+        pts = load_points(args.input, args.dtype)
+    except (OSError, ValueError, TypeError) as e:
+        parser.error(str(e))
+    begin = time.perf_counter()
+
+    def progress(done, n, h):
+        if args.verbose:
+            rate = done / (time.perf_counter() - begin)
+            print(f"{done:>12}/{n} points  h={h:<6} {rate:,.0f} points/s", file=sys.stderr)
+
+    hull = streaming_hull(pts, args.chunk_size, args.prefilter, progress)
+    elapsed = time.perf_counter() - begin
+
+    if args.output:
+        save_points(args.output, hull)
+    rate = len(pts) / elapsed if elapsed > 0 else float("inf")
+    print(f"{len(pts)} points, {len(hull)} hull vertices, {elapsed:.3f} s, {rate:,.0f} points/s")
+
+
+if __name__ == "__main__":
+    main()
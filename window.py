@@ -0,0 +1,84 @@
+import numpy as np
+
+from incremental import IncrementalHull, ring_vertices
+from predicates import orient_sign
+
+
+# Hull of a sliding window over a point stream: new points come in at one end
+# and the oldest expire at the other. The window is a queue made of two stacks:
+#   back:  the newest points, in an IncrementalHull; appending is one insert
+#   front: the older points, inserted newest first into an IncrementalHull
+#          with undo=True, so expiring the oldest point undoes the last insert
+# When the front runs empty, the back moves over to it, inserted in reverse.
+# Every point moves once, so append() and expire() are amortized O(log h).
+# vertices() merges the hull chains of the two halves in O(h) and is cached
+# until the window changes.
+
+
+def _merge_chains(A, B, s):
+    # the chain (as in incremental.py) of the points of the chains A and B;
+    # sorted() just merges the two sorted runs
+    C = []
+    for p in sorted(A + B):
+        if C and C[-1] == p:
+            continue
+        while len(C) >= 2 and s * orient_sign(C[-2], C[-1], p) <= 0:
+            C.pop()
+        C.append(p)
+    return C
+
+
+class WindowHull:
+
+    def __init__(self, size=None):
+        # size: keep at most this many points, expiring the oldest beyond it
+        self.size = size
+        self._front = IncrementalHull(undo=True)
+        self._back = IncrementalHull()
+        self._back_pts = []
+        self._vertices = None
+
+    def __len__(self):
+        # points in the window
+        return self._front.n + len(self._back_pts)
+
+    def append(self, p):
+        # add the newest point p = (x, y)
+        p = tuple(p.tolist()) if isinstance(p, np.ndarray) else tuple(p)
+        self._back.insert(p)
+        self._back_pts.append(p)
+        self._vertices = None
+        if self.size is not None and len(self) > self.size:
+            self.expire()
+
+    def extend(self, pts):
+        # append all rows of an (n, 2) array, oldest first
+        for p in np.asarray(pts).tolist():
+            self.append(p)
+
+    def expire(self, k=1):
+        # drop the k oldest points
+        if k > len(self):
+            raise IndexError(f"cannot expire {k} of {len(self)} points")
+        for _ in range(k):
+            if self._front.n == 0:
+                self._flip()
+            self._front.undo()
+        self._vertices = None
+
+    def _flip(self):
+        front = IncrementalHull(undo=True)
+        for p in reversed(self._back_pts):
+            front.insert(p)
+        self._front = front
+        self._back = IncrementalHull()
+        self._back_pts = []
+
+    def vertices(self):
+        # ccw hull vertices of the window as an (h, 2) array, starting from
+        # the lowest point on the canvas like graham_scan()
+        if self._vertices is None:
+            front, back = self._front, self._back
+            self._vertices = ring_vertices(_merge_chains(front.lower, back.lower, 1),
+                                           _merge_chains(front.upper, back.upper, -1))
+        return self._vertices